@@ -17,6 +17,7 @@ import subprocess
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import shell_cmd_timeout
 from oeqa.utils.helper import get_files_dir
+from oeqa.utils.helper import run_many
 from oeqa.utils.decorators import tag
 
 @tag(TestType="FVT")
@@ -31,12 +32,12 @@ class CommBTTest(oeRuntimeTest):
         @return
         """
         # un-block software rfkill lock
-        self.target.run('rfkill unblock all')
-        self.target.run('hciconfig hci0 reset')
-        time.sleep(1)
-        self.target.run('hciconfig hci0 up')
-        self.target.run('hciconfig hci0 piscan')
-        self.target.run('hciconfig hci0 noleadv')
+        run_many(self.target, ['rfkill unblock all',
+                               'hciconfig hci0 reset',
+                               'sleep 1',
+                               'hciconfig hci0 up',
+                               'hciconfig hci0 piscan',
+                               'hciconfig hci0 noleadv'])
         time.sleep(1)
         shell_cmd_timeout('hciconfig hci0 reset', timeout=200)
         time.sleep(1)
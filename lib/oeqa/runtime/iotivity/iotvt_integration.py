@@ -18,6 +18,9 @@ import subprocess
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import get_files_dir
 from oeqa.utils.helper import shell_cmd_timeout
+from oeqa.utils.helper import run_many
+from oeqa.utils.helper import read_file
+from oeqa.utils.helper import wait_for_output
 from oeqa.utils.decorators import tag
 
 @tag(TestType="EFT", FeatureID="IOTOS-754,IOTOS-1019")
@@ -32,18 +35,21 @@ class IOtvtIntegration(oeRuntimeTest):
         @param cls
         @return
         '''
-        cls.tc.target.run("killall presenceserver presenceclient devicediscoveryserver devicediscoveryclient")        
-        cls.tc.target.run("killall fridgeserver fridgeclient garageserver garageclient groupserver groupclient")
-        cls.tc.target.run("killall roomserver roomclient simpleserver simpleclient simpleserverHQ simpleclientHQ")
-        cls.tc.target.run("killall simpleclientserver threadingsample")
-        # Setup firewall accept for multicast
-        cls.tc.target.run("/usr/sbin/iptables -w -A INPUT -p udp --dport 5683 -j ACCEPT")
-        cls.tc.target.run("/usr/sbin/iptables -w -A INPUT -p udp --dport 5684 -j ACCEPT")
+        run_many(cls.tc.target, [
+            "killall presenceserver presenceclient devicediscoveryserver devicediscoveryclient",
+            "killall fridgeserver fridgeclient garageserver garageclient groupserver groupclient",
+            "killall roomserver roomclient simpleserver simpleclient simpleserverHQ simpleclientHQ",
+            "killall simpleclientserver threadingsample",
+            # Setup firewall accept for multicast
+            "/usr/sbin/iptables -w -A INPUT -p udp --dport 5683 -j ACCEPT",
+            "/usr/sbin/iptables -w -A INPUT -p udp --dport 5684 -j ACCEPT"])
 
-    def presence_check(self, para):
+    def presence_check(self, para, expected):
         '''this is a function used by presence test
         @fn presence_check
         @param self
+        @param para client observation mode
+        @param expected number of notifications the mode should receive
         @return
         '''
         # start server
@@ -53,9 +59,12 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/presenceclient -t %d > /tmp/output &" % para
         self.target.run(client_cmd, timeout=20)
-        # Some platform is too slow, it needs more time to sleep. E.g. MinnowMax
-        time.sleep(25)
-        (status, output) = self.target.run("cat /tmp/output")
+        # Some platform is too slow, it needs up to 25s. E.g. MinnowMax
+        # The count has to be exact, so wait the whole time unless one
+        # notification more than expected arrives, which fails anyway
+        notification = "Received presence notification from"
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                                          [notification] * (expected + 1), 25)
         self.target.run("killall presenceserver presenceclient") 
         time.sleep(3)       
         return output.count("Received presence notification from")
@@ -76,16 +85,11 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/devicediscoveryclient > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
-        time.sleep(5)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "Device name" in output and "Bill's Battlestar" in output and \
-           "Spec version url" in output and "0.9.0" in output and \
-           "Data Model Model" in output and "sec.0.95" in output:
-            pass
-        else:
-            ret = 1
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["Device name", "Bill's Battlestar", "Spec version url",
+                 "0.9.0", "Data Model Model", "sec.0.95"], 5)
+        ret = 0 if found else 1
         # kill server and client
         self.target.run("killall devicediscoveryserver devicediscoveryclient")        
         time.sleep(3)       
@@ -111,19 +115,15 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/fridgeclient > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
-        time.sleep(5)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "Name of device: Intel Powered 2 door, 1 light refrigerator" in output and \
-           "Get ID is 1 and resource URI is /light" in output and \
-           "Get ID is 2 and resource URI is /door/left" in output and \
-           "Get ID is 3 and resource URI is /door/right" in output and \
-           "Get ID is 4 and resource URI is /door/random" in output and \
-           "Delete ID is 0 and resource URI is /device" in output:
-            pass
-        else:
-            ret = 1
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["Name of device: Intel Powered 2 door, 1 light refrigerator",
+                 "Get ID is 1 and resource URI is /light",
+                 "Get ID is 2 and resource URI is /door/left",
+                 "Get ID is 3 and resource URI is /door/right",
+                 "Get ID is 4 and resource URI is /door/random",
+                 "Delete ID is 0 and resource URI is /device"], 5)
+        ret = 0 if found else 1
         # kill server and client
         self.target.run("killall fridgeserver fridgeclient")        
         time.sleep(3)       
@@ -149,17 +149,13 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/garageclient > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
-        time.sleep(5)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "GET request was successful" in output and \
-           "attribute: name, was removed successfully from rep2." in output and \
-           "Number of attributes in rep2: 6" in output and \
-           "PUT request was successful" in output:
-            pass
-        else:
-            ret = 1
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["GET request was successful",
+                 "attribute: name, was removed successfully from rep2.",
+                 "Number of attributes in rep2: 6",
+                 "PUT request was successful"], 5)
+        ret = 0 if found else 1
         # kill server and client
         self.target.run("killall garageserver garageclient")        
         time.sleep(3)       
@@ -213,7 +209,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(1)
+        number = self.presence_check(1, 7)
         ##
         # TESTPOINT: #1, test_presence_unicast
         #
@@ -225,7 +221,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(2)
+        number = self.presence_check(2, 3)
         ##
         # TESTPOINT: #1, test_presence_unicast_one_filter
         #
@@ -237,7 +233,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(3)
+        number = self.presence_check(3, 4)
         ##
         # TESTPOINT: #1, test_presence_unicast_two_filters
         #
@@ -249,7 +245,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(4)
+        number = self.presence_check(4, 7)
         ##
         # TESTPOINT: #1, test_presence_multicast
         #
@@ -261,7 +257,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(5)
+        number = self.presence_check(5, 3)
         ##
         # TESTPOINT: #1, test_presence_multicast_one_filter
         #
@@ -273,7 +269,7 @@ class IOtvtIntegration(oeRuntimeTest):
         @param self
         @return
         '''
-        number = self.presence_check(6)
+        number = self.presence_check(6, 4)
         ##
         # TESTPOINT: #1, test_presence_multicast_two_filters
         #
@@ -296,7 +292,8 @@ class IOtvtIntegration(oeRuntimeTest):
         client_cmd = "/opt/iotivity/examples/resource/cpp/roomclient > /tmp/output &"
         self.target.run(client_cmd)
         time.sleep(5)
-        (status, output) = self.target.run("cat /tmp/svr_output | grep 'In Server CPP entity handler' -c")
+        (status, output) = read_file(self.target, '/tmp/svr_output')
+        output = str(output.count('In Server CPP entity handler'))
         # kill server and client
         self.target.run("killall roomserver roomclient")     
         time.sleep(3)   
@@ -321,7 +318,7 @@ class IOtvtIntegration(oeRuntimeTest):
         client_cmd = "/opt/iotivity/examples/resource/cpp/roomclient > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
         time.sleep(3)
-        (status, output) = self.target.run("cat /tmp/svr_output")
+        (status, output) = read_file(self.target, '/tmp/svr_output')
         # kill server and client
         self.target.run("killall roomserver roomclient")        
         time.sleep(3)
@@ -345,19 +342,15 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/simpleclient > /tmp/output &"
         self.target.run(client_cmd, timeout=90)
-        print "\npatient... simpleclient needs long time for its observation"
-        time.sleep(70)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "DISCOVERED Resource" in output and \
-           "GET request was successful" in output and \
-           "PUT request was successful" in output and \
-           "POST request was successful" in output and \
-           "Observe is used." in output:
-            pass
-        else:
-            ret = 1
+        print "\npatient... simpleclient needs up to 70s for its observation"
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["DISCOVERED Resource",
+                 "GET request was successful",
+                 "PUT request was successful",
+                 "POST request was successful",
+                 "Observe is used."], 70)
+        ret = 0 if found else 1
         # kill server and client
         self.target.run("killall simpleserver simpleclient")        
         time.sleep(3)
@@ -383,19 +376,15 @@ class IOtvtIntegration(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/simpleclientHQ > /tmp/output &"
         self.target.run(client_cmd, timeout=90)
-        print "\npatient... simpleclientHQ needs long time for its observation"
-        time.sleep(70)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "DISCOVERED Resource" in output and \
-           "GET request was successful" in output and \
-           "PUT request was successful" in output and \
-           "POST request was successful" in output and \
-           "Observe is used." in output:
-            pass
-        else:
-            ret = 1
+        print "\npatient... simpleclientHQ needs up to 70s for its observation"
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["DISCOVERED Resource",
+                 "GET request was successful",
+                 "PUT request was successful",
+                 "POST request was successful",
+                 "Observe is used."], 70)
+        ret = 0 if found else 1
         # kill server and client
         self.target.run("killall simpleserverHQ simpleclientHQ")        
         time.sleep(3)
@@ -413,17 +402,11 @@ class IOtvtIntegration(oeRuntimeTest):
         # start test
         client_cmd = "/opt/iotivity/examples/resource/cpp/simpleclientserver > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
-        time.sleep(10)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "Found Resource" in output and \
-           "Successful Get" in output and \
-           "Successful Put" in output and \
-           "barCount: 211" in output:
-            pass
-        else:
-            ret = 1
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["Found Resource", "Successful Get", "Successful Put",
+                 "barCount: 211"], 10)
+        ret = 0 if found else 1
         # kill test
         self.target.run("killall simpleclientserver")        
         time.sleep(3)
@@ -447,17 +430,11 @@ class IOtvtIntegration(oeRuntimeTest):
         client_cmd = "/opt/iotivity/examples/resource/cpp/threadingsample > /tmp/output &"
         self.target.run(client_cmd, timeout=20)
         print "\n patient, threadingsample needs some time to open 3 threads"
-        time.sleep(20)
-        (status, output) = self.target.run('cat /tmp/output')
-        # judge if the values are correct
-        ret = 0
-        if "URI:  /q/foo1" in output and \
-           "URI:  /q/foo2" in output and \
-           "Successful Get." in output and \
-           "Successful Put." in output:
-            pass
-        else:
-            ret = 1
+        # wait for the values, judge if they are correct
+        (found, output) = wait_for_output(self.target, "/tmp/output",
+                ["URI:  /q/foo1", "URI:  /q/foo2", "Successful Get.",
+                 "Successful Put."], 20)
+        ret = 0 if found else 1
         # kill test
         self.target.run("killall threadingsample")        
         time.sleep(3)
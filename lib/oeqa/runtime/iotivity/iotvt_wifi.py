@@ -12,12 +12,13 @@
 ##
 
 import os
-import time
 import string
 from oeqa.runtime.wifi import wifi
 import ConfigParser
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import shell_cmd_timeout
+from oeqa.utils.helper import run_many
+from oeqa.utils.helper import wait_for_output
 from oeqa.utils.decorators import tag
 
 ssid_config = ConfigParser.ConfigParser()
@@ -45,15 +46,18 @@ class IOtvtWiFi(oeRuntimeTest):
         wifi.execute_connection(ap_type, ssid, pwd)
         
         # Clean up all iotivity related daemons
-        cls.tc.target.run("killall presenceserver presenceclient devicediscoveryserver devicediscoveryclient")        
-        cls.tc.target.run("killall fridgeserver fridgeclient garageserver garageclient groupserver groupclient")
-        cls.tc.target.run("killall roomserver roomclient simpleserver simpleclient simpleserverHQ simpleclientHQ")
-        cls.tc.target.run("killall simpleclientserver threadingsample")
+        run_many(cls.tc.target, [
+            "killall presenceserver presenceclient devicediscoveryserver devicediscoveryclient",
+            "killall fridgeserver fridgeclient garageserver garageclient groupserver groupclient",
+            "killall roomserver roomclient simpleserver simpleclient simpleserverHQ simpleclientHQ",
+            "killall simpleclientserver threadingsample"])
         # Do simpleclient test
         client_cmd = "/opt/iotivity/examples/resource/cpp/simpleclient > /tmp/output &"
         cls.tc.target.run(client_cmd)
-        print "\npatient... simpleclient needs long time for its observation"
-        time.sleep(70)
+        print "\npatient... simpleclient needs up to 70s for its observation"
+        wait_for_output(cls.tc.target, "/tmp/output",
+                        ["DISCOVERED Resource", "GET request was successful",
+                         "PUT request was successful", "Observe is used."], 70)
 
     @classmethod
     def tearDownClass(cls):
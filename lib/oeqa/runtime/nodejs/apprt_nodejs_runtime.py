@@ -15,15 +15,20 @@ import os
 import sys
 import time
 import shutil
+import hashlib
+import threading
 import subprocess
 import ConfigParser
 
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.decorators import tag
+from oeqa.utils.sshpool import PooledSSHControl
+from oeqa.utils.helper import iter_run
 
-from apprt_nodejs_runtime_log_parser import print_test_results
-from apprt_nodejs_runtime_log_parser import parse_test_cases
-from apprt_nodejs_runtime_log_parser import write_test_results
+from apprt_nodejs_runtime_log_parser import iter_segments
+from apprt_nodejs_runtime_log_parser import iter_test_results
+from apprt_nodejs_runtime_log_parser import print_test_result
+from apprt_nodejs_runtime_log_parser import format_test_result
 from nodejs_remove_blacklist_tests import remove_blacklist
 
 
@@ -197,9 +202,6 @@ def choose_test_files_and_tar(local_nodejs_path, node_version):
         os.unlink('%s.tar.gz' % node_test_dir)
 
     # The 3 directories are certain to be used
-    sys.stdout.write('Removing blacklist tests')
-    sys.stdout.flush()
-    remove_blacklist(apprt_files_dir, node_version)
     copy_dirs = ['tools', 'test', 'deps/v8/tools']
     for single_dir in copy_dirs:
         shutil.copytree(os.path.join(local_nodejs_path, single_dir),
@@ -209,6 +211,10 @@ def choose_test_files_and_tar(local_nodejs_path, node_version):
         if os.path.isfile(file_path):
             shutil.copyfile(file_path,
                             os.path.join(node_test_dir, filename))
+    # the blacklist applies to the copied test directory
+    sys.stdout.write('Removing blacklist tests')
+    sys.stdout.flush()
+    remove_blacklist(apprt_files_dir, node_version)
 
     compact_cmd = ['tar', '-czf']
     compact_cmd.append('%s.tar.gz' % node_test_dir)
@@ -220,6 +226,106 @@ def choose_test_files_and_tar(local_nodejs_path, node_version):
     return p.returncode
 
 
+def get_bundle_key(node_version, blacklist_file):
+    '''
+    Identify a test bundle: it only depends on the node version and on the
+    test cases removed by the blacklist.
+    @fn get_bundle_key
+    @param node_version
+    @param blacklist_file
+    @return
+    '''
+    sha = hashlib.sha1(node_version)
+    with open(blacklist_file) as f:
+        sha.update(f.read())
+    return sha.hexdigest()[:12]
+
+
+def build_test_bundle(files_dir, config_path, node_version, bundle):
+    '''
+    Build node_<version>_test.tar.gz from the node.js sources and store it
+    as bundle. The node.js repository and the intermediate files are removed
+    afterwards, only the bundle is kept.
+    @fn build_test_bundle
+    @param files_dir
+    @param config_path
+    @param node_version
+    @param bundle
+    @return
+    '''
+    nodejs_dir = os.path.join(files_dir, 'node')
+    node_test_dir = os.path.join(files_dir, 'node_%s_test' % node_version)
+    node_zip = os.path.join(files_dir, '%s.zip' % node_version)
+
+    # Clean the wokrspace directory to avoid error when a previous build
+    # failed, this ususally causes the failure of second-time to run.
+    clean_work_files(files_dir, node_version)
+
+    try:
+        sys.stdout.write('Downloading node.js repository...')
+        sys.stdout.flush()
+        ret = get_nodejs_repo(nodejs_dir, config_path, node_version)
+        if ret != 0:
+            sys.stderr.write('Fail to download node.js repo\n')
+            return ret
+        sys.stdout.write('\r' + ' ' * 78 + '\r')
+        sys.stdout.write('Downloading node.js repository DONE\n')
+        sys.stdout.flush()
+
+        sys.stdout.write(
+            'Checking out node.js to branch %s...' % node_version)
+        sys.stdout.flush()
+        ret = checkout_nodejs(nodejs_dir, node_version)
+        if ret != 0:
+            sys.stderr.write('Fail to checkout node.js with version %s\n'
+                             % node_version)
+            return ret
+        sys.stdout.write('\r' + ' ' * 78 + '\r')
+        sys.stdout.write(
+            'Checking out node.js to branch %s DONE\n' % node_version)
+        sys.stdout.flush()
+
+        sys.stdout.write('Choosing necessary files for tests...')
+        sys.stdout.flush()
+        ret = choose_test_files_and_tar(nodejs_dir, node_version)
+        if ret != 0:
+            sys.stderr.write('Fail to copy test files and tar\n')
+            return ret
+        sys.stdout.write('\r' + ' ' * 78 + '\r')
+        sys.stdout.write('Choosing necessary files for tests DONE\n')
+        sys.stdout.flush()
+
+        if not os.path.isdir(os.path.dirname(bundle)):
+            os.makedirs(os.path.dirname(bundle))
+        shutil.move('%s.tar.gz' % node_test_dir, bundle + '.tmp')
+        os.rename(bundle + '.tmp', bundle)
+        return 0
+    finally:
+        # keep the downloaded archive for the next build
+        if os.path.exists(node_zip) and \
+           not os.path.exists('/tmp/%s.zip' % node_version):
+            shutil.copyfile(node_zip, '/tmp/%s.zip' % node_version)
+        clean_work_files(files_dir, node_version)
+
+
+def clean_work_files(files_dir, node_version):
+    '''
+    Remove the node.js repository and intermediate files of a bundle build.
+    @fn clean_work_files
+    @param files_dir
+    @param node_version
+    @return
+    '''
+    node_test_dir = os.path.join(files_dir, 'node_%s_test' % node_version)
+    for path in [os.path.join(files_dir, 'node'), node_test_dir]:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+    for path in ['%s.tar.gz' % node_test_dir,
+                 os.path.join(files_dir, '%s.zip' % node_version)]:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
 @tag(TestType='EFT', FeatureID='IOTOS-332')
 class NodejsRuntimeTest(oeRuntimeTest):
     """
@@ -235,6 +341,9 @@ class NodejsRuntimeTest(oeRuntimeTest):
     node_zip = None
     config_path = None
     config = None
+    use_cache = False
+    bundle_key = None
+    bundle = None
 
     def setUp(self):
         '''
@@ -247,6 +356,8 @@ class NodejsRuntimeTest(oeRuntimeTest):
             target device
         3. Change some configuration that before the test start.
         4. Upload the necessary files and directories on the target device.
+        The test bundle of steps 1-3 is cached on host, and step 4 is skipped
+        when the same bundle is already extracted on the target device.
         @fn setUp
         @param self
         @return
@@ -263,11 +374,6 @@ class NodejsRuntimeTest(oeRuntimeTest):
             'noderuntime',
             'apprt_nodejs_runtime_config')
 
-        # Clean the wokrspace directory to avoid error when setUp fails, 
-        # this ususally causes the failure of second-time to run.
-        if os.path.exists(self.nodejs_dir):
-            shutil.rmtree(self.nodejs_dir)
-
         self.config = ConfigParser.ConfigParser()
         self.config.read(self.config_path)
         self.target_node_path = self.config.get('target', 'node_path')
@@ -295,83 +401,113 @@ class NodejsRuntimeTest(oeRuntimeTest):
                 self.target_node_version)
             sys.stdout.flush()
 
-        # Consider the failure of the setUp, we need to clean before we do
-        # anything.
-        self.node_zip = os.path.join(
-            self.files_dir,
-            '%s.zip' %
-            self.target_node_version)
-        if os.path.exists(self.node_zip):
-            os.unlink(self.node_zip)
-
-        node_test_dir = os.path.join(
-            self.files_dir,
-            'node_%s_test' %
-            self.target_node_version)
-        if os.path.exists(node_test_dir):
-            shutil.rmtree(node_test_dir)
-        if os.path.exists('%s.tar.gz' % node_test_dir):
-            os.unlink('%s.tar.gz' % node_test_dir)
-
-        sys.stdout.write('Downloading node.js repository...')
-        sys.stdout.flush()
-        ret = get_nodejs_repo(
-            self.nodejs_dir,
-            self.config_path,
-            self.target_node_version)
-        if ret != 0:
-            sys.stderr.write('Fail to download node.js repo\n')
+        # The bundle only changes with the node version and the blacklist,
+        # build it once and keep it on host and target across runs.
+        self.use_cache = not self.config.has_option('cache', 'enabled') or \
+            self.config.getboolean('cache', 'enabled')
+        self.bundle_key = get_bundle_key(
+            self.target_node_version,
+            os.path.join(self.files_dir, 'noderuntime', 'blacklist'))
+        if self.use_cache:
+            bundle_dir = os.path.expanduser(
+                self.config.get('cache', 'bundle_dir'))
+        else:
+            bundle_dir = self.files_dir
+        bundle = os.path.join(
+            bundle_dir,
+            'node_%s_test-%s.tar.gz' %
+            (self.target_node_version, self.bundle_key))
+
+        if self.use_cache and os.path.exists(bundle):
+            sys.stdout.write('Using cached %s\n' % bundle)
+            sys.stdout.flush()
+        else:
+            ret = build_test_bundle(
+                self.files_dir,
+                self.config_path,
+                self.target_node_version,
+                bundle)
+            if ret != 0:
+                sys.exit(1)
+
+        self.bundle = bundle
+        if self._prepare_target(self.target, bundle) != 0:
             sys.exit(1)
-        sys.stdout.write('\r' + ' ' * 78 + '\r')
-        sys.stdout.write('Downloading node.js repository DONE\n')
-        sys.stdout.flush()
 
+    def _prepare_target(self, target, bundle):
+        '''
+        Make sure the test bundle is extracted on a device and points to
+        its node binary.
+        @fn _prepare_target
+        @param self
+        @param target
+        @param bundle
+        @return 0 on success
+        '''
+        (status, output) = target.run(
+            'cat /tmp/node_%s_test/.bundle' % self.target_node_version)
+        if self.use_cache and status == 0 and \
+           output.strip() == self.bundle_key:
+            sys.stdout.write(
+                'node_%s_test already extracted on target device\n' %
+                self.target_node_version)
+            sys.stdout.flush()
+        elif self._upload_bundle(target, bundle) != 0:
+            return 1
+
+        (status, output) = target.run(
+            'mkdir -p /tmp/node_%s_test/out/Release' % self.target_node_version)
+        if status != 0:
+            sys.stderr.write('Fail to mkdir out/Release in node directory\n')
+            return 1
         sys.stdout.write(
-            'Checking out node.js to branch %s...' %
-            self.target_node_version)
-        sys.stdout.flush()
-        ret = checkout_nodejs(self.nodejs_dir, self.target_node_version)
-        if ret != 0:
-            sys.stderr.write('Fail to checkout node.js with version %s\n'
-                             % self.target_node_version)
-            sys.exit(1)
-        sys.stdout.write('\r' + ' ' * 78 + '\r')
-        sys.stdout.write(
-            'Checking out node.js to branch %s DONE\n' %
+            'mkdir -p /tmp/node_%s_test/out/Release DONE\n' %
             self.target_node_version)
         sys.stdout.flush()
 
-        sys.stdout.write('Choosing necessary files for tests...')
-        sys.stdout.flush()
-        ret = choose_test_files_and_tar(
-            self.nodejs_dir,
-            self.target_node_version)
-        if ret != 0:
-            sys.stderr.write('Fail to copy test files and tar\n')
-            sys.exit(1)
-        sys.stdout.write('\r' + ' ' * 78 + '\r')
-        sys.stdout.write('Choosing necessary files for tests DONE\n')
-        sys.stdout.flush()
+        (status, output) = target.run(
+            'ln -fs %s /tmp/node_%s_test/out/Release/node' %
+            (self.target_node_path, self.target_node_version))
+        if status != 0:
+            sys.stderr.write(
+                'Fail to link %s -> /tmp/node_%s_test/out/Release/node\n' %
+                (self.target_node_path, self.target_node_version))
+        else:
+            sys.stdout.write(
+                'ln -fs %s /tmp/node_%s_test/out/Release/node DONE\n' %
+                (self.target_node_path, self.target_node_version))
+            sys.stdout.flush()
+        return 0
 
+    def _upload_bundle(self, target, bundle):
+        '''
+        Copy the test bundle to a device and extract it to
+        /tmp/node_<version>_test, marked with the bundle key.
+        @fn _upload_bundle
+        @param self
+        @param target
+        @param bundle
+        @return 0 on success
+        '''
         # Clean /tmp directory to make sure no node_VERSION_test directory
         # and no node_VERSION_test.tar.gz file on target
-        self.target.run('rm -fr /tmp/node_%s_test/' % self.target_node_version)
-        self.target.run(
+        target.run('rm -fr /tmp/node_%s_test/' % self.target_node_version)
+        target.run(
             'rm -f /tmp/node_%s_test.tar.gz' %
             self.target_node_version)
 
         sys.stdout.write('Copying necessary files to target...')
         sys.stdout.flush()
-        (status, output) = self.target.copy_to(
-            os.path.join(
-                self.files_dir,
-                'node_%s_test.tar.gz' %
-                self.target_node_version),
-            '/tmp/node_%s_test.tar.gz' %
-            self.target_node_version)
+        try:
+            (status, output) = target.copy_to(
+                bundle,
+                '/tmp/node_%s_test.tar.gz' %
+                self.target_node_version)
+        except AssertionError:
+            status = 1
         if status != 0:
             sys.stderr.write('Fail to copy archives to the target device\n')
-            sys.exit(1)
+            return 1
         sys.stdout.write('\r' + ' ' * 78 + '\r')
         sys.stdout.write(
             'Copying node_%s_test.tar.gz to target device DONE\n' %
@@ -380,45 +516,106 @@ class NodejsRuntimeTest(oeRuntimeTest):
 
         sys.stdout.write('Extracting tar files on target...')
         sys.stdout.flush()
-        (status, output) = self.target.run(
-            'tar -xzf  /tmp/node_%s_test.tar.gz -C /tmp/' % \
-            self.target_node_version)
+        (status, output) = target.run(
+            'tar -xzf  /tmp/node_%s_test.tar.gz -C /tmp/ && '
+            'echo %s > /tmp/node_%s_test/.bundle && '
+            'rm -f /tmp/node_%s_test.tar.gz' %
+            (self.target_node_version, self.bundle_key,
+             self.target_node_version, self.target_node_version))
         if status != 0:
             sys.stderr.write('Fail to extract node.js test files\n')
-            sys.exit(1)
+            return 1
         sys.stdout.write('\r' + ' ' * 78 + '\r')
         sys.stdout.write(
             'Extracting node_%s_test.tar.gz on target device DONE\n' %
             self.target_node_version)
         sys.stdout.flush()
+        return 0
 
-        (status, output) = self.target.run(
-            'mkdir -p /tmp/node_%s_test/out/Release' % self.target_node_version)
-        if status != 0:
-            sys.stderr.write('Fail to mkdir out/Release in node directory\n')
-            sys.exit(1)
-        sys.stdout.write(
-            'mkdir -p /tmp/node_%s_test/out/Release DONE\n' %
-            self.target_node_version)
-        sys.stdout.flush()
-
-        (status, output) = self.target.run(
-            'ln -fs %s /tmp/node_%s_test/out/Release/node' %
-            (self.target_node_path, self.target_node_version))
-        if status != 0:
-            sys.stderr.write(
-                'Fail to link %s -> /tmp/node_%s_test/out/Release/node\n' %
-                (self.target_node_path, self.target_node_version))
-        else:
-            sys.stdout.write(
-                'ln -fs %s /tmp/node_%s_test/out/Release/node DONE\n' %
-                (self.target_node_path, self.target_node_version))
+    def _get_jobs(self, target):
+        '''
+        Number of tests to run in parallel on a device: [test] jobs, or
+        one per core of the device.
+        @fn _get_jobs
+        @param self
+        @param target
+        @return
+        '''
+        if self.config.has_option('test', 'jobs'):
+            jobs = self.config.get('test', 'jobs').strip()
+            if jobs and int(jobs) > 0:
+                return int(jobs)
+        (status, output) = target.run('grep -c ^processor /proc/cpuinfo')
+        if status != 0 or not output.strip().isdigit():
+            return 1
+        return max(int(output.strip()), 1)
+
+    def _get_extra_boards(self):
+        '''
+        Connect and prepare the boards listed in [test] extra_targets,
+        they share the module list with the target under test.
+        @fn _get_extra_boards
+        @param self
+        @return
+        '''
+        boards = []
+        if not self.config.has_option('test', 'extra_targets'):
+            return boards
+        for ip in self.config.get('test', 'extra_targets').replace(
+                ',', ' ').split():
+            board = PooledSSHControl(ip)
+            sys.stdout.write('Preparing extra board %s...\n' % ip)
             sys.stdout.flush()
+            if self._prepare_target(board, self.bundle) == 0:
+                boards.append(board)
+            else:
+                sys.stderr.write('Skip extra board %s\n' % ip)
+                board.close()
+        return boards
+
+    def _run_upstream_tests(self, target, test_modules, start, results):
+        '''
+        Run tools/test.py for test_modules on a device, with one job per
+        core. Every test result is printed and written to the result file
+        as soon as its progress line arrives.
+        @fn _run_upstream_tests
+        @param self
+        @param target
+        @param test_modules
+        @param start
+        @param results shared file and counters
+        @return
+        '''
+        jobs = self._get_jobs(target)
+        sys.stdout.write('Running %s with %d jobs on %s\n' %
+                         (' '.join(test_modules) or 'all modules', jobs,
+                          target.ip))
+        sys.stdout.flush()
+        output = iter_run(
+            target,
+            'cd /tmp/node_%s_test/; python tools/test.py -j %d %s -v' %
+            (self.target_node_version, jobs, ' '.join(test_modules)))
+        try:
+            for test in iter_test_results(iter_segments(output), start,
+                                         jobs):
+                with results['lock']:
+                    print_test_result(test)
+                    results['file'].write(format_test_result(test))
+                    results['file'].flush()
+                    results['total'] += 1
+                    if not test.values()[0]['success']:
+                        results['failed'] += 1
+        except ValueError:
+            sys.stderr.write('Fail to parse test results of %s\n' %
+                             target.ip)
 
     @tag(CasesNumber=865)
     def test_apprt_nodejs_runtime(self):
         '''
-        Execute the node.js upstream test cases.
+        Execute the node.js upstream test cases. Every device runs as many
+        tests in parallel as it has cores, and the modules are split across
+        the boards of [test] extra_targets if any. Results are written to
+        the result file while the tests run.
         @fn test_apprt_nodejs_runtime
         @param self
         @return
@@ -427,21 +624,36 @@ class NodejsRuntimeTest(oeRuntimeTest):
         sys.stdout.flush()
         start = time.time()
 
-        test_modules = self.config.get('test', 'specified_modules')
-        (status, output) = self.target.run(
-            'cd /tmp/node_%s_test/; python tools/test.py %s -v' %
-            (self.target_node_version, test_modules))
-
-        output = output.strip().split('\r')
-        print_test_results(parse_test_cases(output, self.target_node_version))
-        write_test_results(
-            output,
-            start,
-            self.config.get(
-                'results',
-                'formatted_result_file'),
-                self.target_node_version
-            )
+        test_modules = self.config.get('test', 'specified_modules').split()
+        extra_boards = self._get_extra_boards()
+        boards = [self.target] + extra_boards
+        if len(boards) > 1:
+            if not test_modules:
+                test_modules = self.config.get(
+                    'test', 'split_modules').split()
+            boards = boards[:len(test_modules)]
+            shards = [test_modules[i::len(boards)]
+                      for i in xrange(len(boards))]
+        else:
+            shards = [test_modules]
+
+        result_file = open(
+            self.config.get('results', 'formatted_result_file'), 'w')
+        results = {'lock': threading.Lock(), 'file': result_file,
+                   'total': 0, 'failed': 0}
+        with result_file:
+            threads = []
+            for index, board in enumerate(boards):
+                thread = threading.Thread(
+                    target=self._run_upstream_tests,
+                    args=(board, shards[index], start, results))
+                thread.start()
+                threads.append(thread)
+            for thread in threads:
+                thread.join()
+        for board in extra_boards:
+            board.close()
+        print '%d tests, %d failed' % (results['total'], results['failed'])
 
 #        statistics = output[-1]
 #        sys.stdout.write(statistics + '\n')
@@ -454,48 +666,28 @@ class NodejsRuntimeTest(oeRuntimeTest):
 
     def tearDown(self):
         '''
-        Clean work: remove all the files downloaded on host and 
-        copied to the target device during the test.
+        Clean work: the cached bundle is kept on host and target for the
+        next run, otherwise remove all the files built on host and copied
+        to the target device during the test.
         @fn tearDown
         @param self
         @return
         '''
-        node_test_dir = os.path.join(
-            self.files_dir,
-            'node_%s_test' %
-            self.target_node_version)
-
-        if os.path.exists(self.nodejs_dir):
-            shutil.rmtree(self.nodejs_dir)
-            sys.stdout.write('Removing node.js repository DONE\n')
-            sys.stdout.flush()
-
-        if os.path.exists(node_test_dir):
-            shutil.rmtree(node_test_dir)
-            sys.stdout.write(
-                'Removing node_%s_test directory DONE\n' %
-                self.target_node_version)
-            sys.stdout.flush()
+        clean_work_files(self.files_dir, self.target_node_version)
+        if self.use_cache:
+            return
 
-        if os.path.exists('%s.tar.gz' % node_test_dir):
-            os.unlink('%s.tar.gz' % node_test_dir)
+        bundle = os.path.join(
+            self.files_dir,
+            'node_%s_test-%s.tar.gz' %
+            (self.target_node_version, self.bundle_key))
+        if os.path.exists(bundle):
+            os.unlink(bundle)
             sys.stdout.write(
                 'Removing node_%s_test.tar.gz DONE\n' %
                 self.target_node_version)
             sys.stdout.flush()
 
-        if os.path.exists(self.node_zip):
-            if not os.path.exists('/tmp/%s.zip' % self.target_node_version):
-                shutil.copyfile(
-                    self.node_zip,
-                    '/tmp/%s.zip' %
-                    self.target_node_version)
-            os.unlink(self.node_zip)
-            sys.stdout.write(
-                'Removing node %s.zip DONE\n' %
-                self.target_node_version)
-            sys.stdout.flush()
-
         self.target.run('rm -fr /tmp/node_%s_test/' % self.target_node_version)
         sys.stdout.write(
             'rm -fr /tmp/node_%s_test/ on target DONE\n' %
@@ -12,6 +12,7 @@
 ##
 
 import time
+import collections
 
 
 def is_a_blank_line(line):
@@ -27,88 +28,161 @@ def is_a_blank_line(line):
     return blank
 
 
-def parse_test_cases(all_test_output, target_node_version):
+def iter_segments(chunks):
+    """
+    Split the output of tools/test.py into the segments separated by '\\r',
+    as the output arrives.
+    @fn iter_segments
+    @param chunks iterable of output data, e.g. a stream being read
+    @return generator of segments
+    """
+    buf = ''
+    for data in chunks:
+        buf += data
+        parts = buf.split('\r')
+        buf = parts.pop()
+        for part in parts:
+            yield part
+    if buf:
+        yield buf
+
+
+def get_elapsed(progress):
+    """
+    Seconds since the start of the run from a progress line,
+    e.g. [01:05|% 100|+ 864|-   1]: Done
+    @fn get_elapsed
+    @param progress
+    @return
+    """
+    (minutes, seconds) = progress.split('|')[0].lstrip('[').split(':')
+    return float(minutes) * 60 + float(seconds)
+
+
+def _test_result(name, info, index, errors, progress, start_time):
+    """
+    Close the record of a test once it is known to be over
+    @fn _test_result
+    @return {test name: info}
+    """
+    info['end'] = index - 1
+    info['duration'] = index - info['start']
+    info['success'] = errors is None
+    # the segments clearing the progress line are blank
+    info['error'] = ''.join(s for s in errors or []
+                            if not is_a_blank_line(s))
+    if start_time is not None:
+        elapsed = get_elapsed(progress) if progress else 0
+        info['result_at'] = time.strftime(
+            '%H:%M:%S', time.gmtime(start_time + elapsed))
+    return {name: info}
+
+
+def iter_test_results(segments, start_time=None, jobs=1):
     '''
-    Parse the full node.js API test cases. 
+    Parse the full node.js API test cases while the output arrives.
+    A progress line '[mm:ss|...]: release <test>' starts a test, which
+    passed unless an error block headed '=== release <test> ===' is
+    printed for it. Error blocks are attributed by the name in their
+    header, as with several jobs the progress line of another test can
+    be printed before a test fails.
+    With one job a test is over once the next progress line arrives, so
+    every test is yielded then. With several jobs a passed test is not
+    reported before the run is Done, a failed test is yielded as soon as
+    the next progress line ends its error block. When the output ends
+    without Done, e.g. ssh died, the tests not reported yet are yielded
+    as failed by an incomplete run.
     More information, please refer to the result log
     of running python tool/test.py
     in node.js repository
+    @fn iter_test_results
+    @param segments the output split on '\\r', see iter_segments
+    @param start_time when the run started, to add 'result_at'
+    @param jobs the -j value tools/test.py ran with
+    @return generator of {test name: info} dicts
+    '''
+    running = collections.OrderedDict()
+    errors = {}
+    failing = None
+    progress = None
+    index = -1
+    for index, segment in enumerate(segments):
+        line = segment.strip()
+        if not line.startswith('['):
+            if line.startswith('==='):
+                label = line.splitlines()[0].strip('= ')
+                failing = label.partition(' ')[2].strip() or label
+                running.setdefault(failing, {'last_exec_info': label,
+                                             'start': index})
+                errors[failing] = []
+            if failing is not None:
+                errors[failing].append(segment)
+            continue
+
+        done = line.endswith(': Done')
+        for name in list(running):
+            if jobs == 1 or done or name in errors:
+                yield _test_result(name, running.pop(name), index,
+                                   errors.pop(name, None), line, start_time)
+        failing = None
+        if done:
+            break
+        progress = line
+        (_, _, test_case_name) = line.partition(': release')
+        running[test_case_name.strip() or line] = {
+            'last_exec_info': line,
+            'start': index}
+    else:
+        for name in list(running):
+            error = errors.pop(name, None) or []
+            error.append('\nIncomplete run: the output ended before Done\n')
+            yield _test_result(name, running.pop(name), index + 1, error,
+                               progress, start_time)
+
+
+def parse_test_cases(all_test_output, target_node_version=None):
+    '''
+    Parse the full node.js API test cases of a complete run.
     @fn parse_test_cases
-    @param all_test_output
-    @return
+    @param all_test_output the output split on '\\r'
+    @return list of {test name: info} dicts
     '''
-    statistics = all_test_output[-1]
-    statistics_list = statistics.lstrip('[').rstrip(']: Done').replace(
-        '%',
-        '').replace(
-        '+',
-        '').replace(
-            '-',
-        '').split('|')
-    failed = int(statistics_list[-1])
-    success = int(statistics_list[-2])
-    all_num = success + failed
-    all_info = []
-
-    start = 0
-    end = 0
-    duration = 2
-    for i in xrange(all_num):
-        test_case = dict()
-        test_case_info = dict()
-        if all_test_output[start].startswith('[') and \
-           is_a_blank_line(all_test_output[start + 1]):
-            if all_test_output[start + 2].startswith('['):
-                end = start + 1
-                duration = 2
-                success = True
-                error = ''
-                test_path = ''.join(['/tmp/node_%s_test/test/' % target_node_version])
-                test_index = all_test_output[start].index(test_path)
-                test_last_index = all_test_output[start].index('.js')
-                test_case_name = all_test_output[start][
-                    test_index +
-                    len(test_path):
-                    test_last_index].strip().replace('/', '-')
-            elif all_test_output[start + 2].startswith('==='):
-                err_start = start + 2
-                i = 0
-                while not all_test_output[err_start + i].startswith('['):
-                    i += 1
-                else:
-                    err_duration = i - 1
-                    end = start + 2 + err_duration
-                duration = i + 2
-                success = False
-                error = ''
-                for i in xrange(err_duration):
-                    error += all_test_output[err_start + i]
-                second_output = all_test_output[start + 2].splitlines()
-                for index, line in enumerate(second_output):
-                    if line.startswith('Path: '):
-                        path_index = line.index('Path: ')
-                        test_case_name_ori = line[path_index + len('Path: '):]
-                        test_case_name = test_case_name_ori.strip().replace('/', '-')
-
-            release_index = all_test_output[start].index(': release')
-            test_case_name = all_test_output[start][
-                release_index +
-                len(': release') +
-                1:].strip()
-
-            test_case_info['last_exec_info'] = all_test_output[start]
-            test_case_info['start'] = start
-            test_case_info['end'] = end
-            test_case_info['duration'] = duration
-            test_case_info['success'] = success
-            test_case_info['error'] = error
-
-            test_case[test_case_name] = test_case_info
-            all_info.append(test_case)
-
-        start += duration
-
-    return all_info
+    return list(iter_test_results(all_test_output))
+
+
+def format_test_result(test):
+    """
+    One line of the formatted result file
+    @fn format_test_result
+    @param test
+    @return
+    """
+    info = test.values()[0]
+    if info['success']:
+        success = 'PASSED'
+    else:
+        success = 'FAILED'
+        success += '\n'
+        success += info['error']
+    return '%s - runexported.py - RESULTS - Testcase %s: %s\n' % \
+        (info['result_at'], test.keys()[0], success)
+
+
+def print_test_result(test):
+    """
+    @fn print_test_result
+    @param test
+    @return
+    """
+    test_name = test.keys()[0]
+    info = '\t' + test_name + '.' * (69 - len(test_name))
+    if test.values()[0]['success']:
+        info += 'OK'
+    else:
+        info += 'FAILED'
+        info += '\n'
+        info += test.values()[0]['error']
+    print info
 
 
 def print_test_results(all_tests):
@@ -119,17 +193,7 @@ def print_test_results(all_tests):
     """
     print '%d tests...' % len(all_tests)
     for t in all_tests:
-        test_name = t.keys()[0]
-        success = t.values()[0]['success']
-        info = '\t' + test_name + '.' * (69 - len(test_name))
-        if success:
-            info += 'OK'
-        else:
-            info += 'FAILED'
-            error = t.values()[0]['error']
-            info += '\n'
-            info += error
-        print info
+        print_test_result(t)
 
 
 def print_error_test_results(all_tests):
@@ -160,36 +224,9 @@ def write_test_results(output, start_time, log_file, target_node_version):
     @param  log_file
     @return
     """
-    output_seq = output
-    all_tests = parse_test_cases(output_seq, target_node_version)
-
-    for i in xrange(len(all_tests) - 1):
-        (minutes, seconds) = all_tests[
-            i + 1].values()[0]['last_exec_info'].split('|')[0].lstrip('[').split(':')
-        elapse = float(minutes) * 60 + float(seconds)
-        all_tests[i].values()[0]['result_at'] = time.strftime(
-            '%H:%M:%S',
-            time.gmtime(
-                start_time +
-                elapse))
-
-    (minutes, seconds) = output_seq[-1].split('|')[0].lstrip('[').split(':')
-    elapse = float(minutes) * 60 + float(seconds)
-    all_tests[-1].values()[0]['result_at'] = time.strftime('%H:%M:%S',
-                                    time.gmtime(start_time + elapse))
-
-    f = open(log_file, 'w')
-    for t in all_tests:
-        if t.values()[0]['success']:
-            success = 'PASSED'
-        else:
-            success = 'FAILED'
-            success += '\n'
-            success += t.values()[0]['error']
-        f.write(
-            '%s - runexported.py - RESULTS - Testcase %s: %s\n' %
-            (t.values()[0]['result_at'], t.keys()[0], success))
-    f.close()
+    with open(log_file, 'w') as f:
+        for t in iter_test_results(output, start_time):
+            f.write(format_test_result(t))
 
 ##
 # @}
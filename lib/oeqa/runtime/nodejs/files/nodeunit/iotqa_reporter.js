@@ -0,0 +1,56 @@
+/*!
+ * nodeunit reporter printing one JSON record per test, so a whole test
+ * file can run in one node process and the harness still gets the
+ * result of every single test.
+ *
+ * Installed into nodeunit's lib/reporters directory and selected with
+ * --reporter <path to this file>.
+ */
+
+var nodeunit = require('../nodeunit'),
+    path = require('path');
+
+// every record line starts with it, tests may print to stdout as well
+var MARKER = '@@IOTQA-NODEUNIT@@ ';
+
+exports.info = 'One JSON record per test, for the iotqa harness';
+
+exports.run = function (files, options, callback) {
+    var paths = files.map(function (p) {
+        return path.resolve(p);
+    });
+
+    nodeunit.runFiles(paths, {
+        testspec: options.testspec,
+        testFullSpec: options.testFullSpec,
+        testDone: function (name, assertions) {
+            var failures = [];
+            assertions.forEach(function (a) {
+                if (a.failed()) {
+                    var e = a.error;
+                    failures.push((a.message ? a.message + ': ' : '') +
+                                  (e && e.stack ? e.stack : String(e)));
+                }
+            });
+            console.log(MARKER + JSON.stringify({
+                test: [].concat(name).join(' - '),
+                assertions: assertions.length,
+                failures: assertions.failures(),
+                duration: assertions.duration,
+                errors: failures
+            }));
+        },
+        done: function (assertions) {
+            console.log(MARKER + JSON.stringify({
+                done: true,
+                assertions: assertions.length,
+                failures: assertions.failures(),
+                duration: assertions.duration
+            }));
+            if (callback) {
+                callback(assertions.failures() ?
+                         new Error('We have got test failures.') : undefined);
+            }
+        }
+    });
+};
@@ -17,6 +17,9 @@ import subprocess
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.decorators import tag
 
+from nodeunit_batch import NodeunitBatch
+from nodeunit_batch import install_nodeunit
+
 
 @tag(TestType='FVT', FeatureID='IOTOS-764')
 class IotivityJSAPITest(oeRuntimeTest):
@@ -31,8 +34,8 @@ class IotivityJSAPITest(oeRuntimeTest):
     iotivity_js_apis_dir = os.path.join(files_dir,
                             iotivity_js_apis
                             )
-    nodeunit_zip = os.path.join(files_dir, 'master.zip')
     target_iotivity_js_apis_dir = '/tmp/%s' % iotivity_js_apis
+    nodeunit = None
     iotivity_js_apis_files = {
         'oic_device': 'test_oic_device.js',
         'oic_client': 'test_oic_client.js',
@@ -97,19 +100,30 @@ class IotivityJSAPITest(oeRuntimeTest):
                             )
 
 
-        if not os.path.exists('/tmp/master.zip'):
-            proc = subprocess.Popen(['wget', 'https://github.com/caolan/nodeunit/archive/master.zip'],
-                                cwd = cls.files_dir)
-            proc.wait()
-        else:
-            os.system('cp -f /tmp/master.zip %s' % (cls.nodeunit_zip))
+        # nodeunit is shared by the nodejs suites
+        install_nodeunit(cls.tc.target)
 
-        if os.path.exists(cls.nodeunit_zip):
-            cls.tc.target.copy_to(cls.nodeunit_zip, '/tmp/master.zip')
-            cls.tc.target.run('cd /tmp/; ' \
-                            'unzip -oq master.zip;' \
-                            'chmod +x /tmp/nodeunit-master/bin/nodeunit'
-                           )
+        # Each test file runs once, the tests look up their own result.
+        # Failed tests run again on their own for clean diagnostics.
+        cls.nodeunit = NodeunitBatch(
+            cls.tc.target,
+            cls.target_iotivity_js_apis_dir,
+            env='export NODE_PATH="/usr/lib/node_modules/"; ',
+            rerun_failures=True)
+        cls.nodeunit.install_reporter()
+
+
+    def _run_nodeunit_test(self, api, test_name):
+        '''
+        Result of one nodeunit test of the api test file.
+        @fn _run_nodeunit_test
+        @param self
+        @param api
+        @param test_name
+        @return (status, output) of the test
+        '''
+        return self.nodeunit.get_result(self.iotivity_js_apis_files[api],
+                                        test_name)
 
 
     def test_oic_device_has_settings_attr(self):
@@ -119,13 +133,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testHasOicDeviceSettingsAttr' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testHasOicDeviceSettingsAttr')
         ##
         # TESTPOINT: #1, test_oic_device_has_settings_attr
         #
@@ -139,13 +148,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceSettingsMemberUrl' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceSettingsMemberUrl')
         ##
         # TESTPOINT: #1, test_oic_device_settings_has_member_url
         #
@@ -159,13 +163,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceSettingsMemberInfo' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceSettingsMemberInfo')
         ##
         # TESTPOINT: #1, test_oic_device_settings_has_member_info
         #
@@ -179,13 +178,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceSettingsMemberRole' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceSettingsMemberRole')
         ##
         # TESTPOINT: #1, test_oic_device_settings_has_member_role
         #
@@ -199,13 +193,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceSettingsMemberConnectionMode' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceSettingsMemberConnectionMode')
         ##
         # TESTPOINT: #1, test_oic_device_settings_has_member_connectionMode
         #
@@ -219,13 +208,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberUuid' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberUuid')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_uuid
         #
@@ -239,13 +223,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberName' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberName')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_name
         #
@@ -259,13 +238,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberDataModels' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberDataModels')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_dataModels
         #
@@ -279,13 +253,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberOsVersion' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberOsVersion')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_coreSpecVersion
         #
@@ -299,13 +268,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberCoreSpecVersion' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberCoreSpecVersion')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_osVersion
         #
@@ -319,13 +283,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberModel' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberModel')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_model
         #
@@ -339,13 +298,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberManufacturerName' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberManufacturerName')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_manufacturerName
         #
@@ -359,13 +313,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberManufacturerUrl' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberManufacturerUrl')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_manufacturerUrl
         #
@@ -379,13 +328,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberManufacturerDate' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberManufacturerDate')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_manufacturerDate
         #
@@ -399,13 +343,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberPlatformVersion' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberPlatformVersion')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_platformVersion
         #
@@ -419,13 +358,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberFirmwareVersion' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberFirmwareVersion')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_firmwareVersion
         #
@@ -439,13 +373,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceInfoMemberFirmwareVersion' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceInfoMemberFirmwareVersion')
         ##
         # TESTPOINT: #1, test_oic_device_settings_info_has_member_supportUrl
         #
@@ -459,13 +388,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceHasaddEventListener' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceHasaddEventListener')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -476,13 +400,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceHasConfigurePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceHasConfigurePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -493,13 +412,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceHasremoveEventListener' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceHasremoveEventListener')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -510,13 +424,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicDeviceHasdispatchEvent' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_device']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_device', 'testOicDeviceHasdispatchEvent')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 # OicClient
@@ -527,13 +436,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasFindResourcesPromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasFindResourcesPromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -544,13 +448,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasFindDevicesPromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasFindDevicesPromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -561,13 +460,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasCreateResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasCreateResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -578,13 +472,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasRetrieveResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasRetrieveResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -595,13 +484,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasUpdateResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasUpdateResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -612,13 +496,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicClientHasDeleteResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_client']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_client', 'testOicClientHasDeleteResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 # OicServer
@@ -629,13 +508,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicServerHasRegisterResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_server']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_server', 'testOicServerHasRegisterResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -646,13 +520,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicServerHasUnregisterResourcePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_server']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_server', 'testOicServerHasUnregisterResourcePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -663,13 +532,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicServerHasEnablePresencePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_server']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_server', 'testOicServerHasEnablePresencePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -680,13 +544,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicServerHasDisablePresencePromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_server']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_server', 'testOicServerHasDisablePresencePromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -697,13 +556,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicServerHasNotifyPromise' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_server']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_server', 'testOicServerHasNotifyPromise')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 # OicResource
@@ -714,13 +568,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicResourceHasaddEventListener' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_resource']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_resource', 'testOicResourceHasaddEventListener')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -731,13 +580,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicResourceHasremoveEventListener' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_resource']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_resource', 'testOicResourceHasremoveEventListener')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -748,13 +592,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testOicResourceHasdispatchEvent' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['oic_resource']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'oic_resource', 'testOicResourceHasdispatchEvent')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 # StorageHandler
@@ -765,13 +604,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testStorageHandleropen' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['storage_handler']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'storage_handler', 'testStorageHandleropen')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -782,13 +616,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testStorageHandlerHasclose' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['storage_handler']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'storage_handler', 'testStorageHandlerHasclose')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -799,13 +628,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testStorageHandlerHasread' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['storage_handler']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'storage_handler', 'testStorageHandlerHasread')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -816,13 +640,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testStorageHandlerHaswrite' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['storage_handler']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'storage_handler', 'testStorageHandlerHaswrite')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
     def test_storage_handler_has_unlink(self):
@@ -832,13 +651,8 @@ class IotivityJSAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'export NODE_PATH="/usr/lib/node_modules/"; cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testStorageHandlerHasunlink' % (
-                    self.target_iotivity_js_apis_dir,
-                    self.target_iotivity_js_apis_dir,
-                    self.iotivity_js_apis_files['storage_handler']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'storage_handler', 'testStorageHandlerHasunlink')
         self.assertTrue('OK:' in api_output.strip().splitlines()[-1])
 
 
@@ -853,13 +667,9 @@ class IotivityJSAPITest(oeRuntimeTest):
         '''
         if os.path.exists('%s.tar.gz' % cls.iotivity_js_apis_dir):
             os.remove('%s.tar.gz' % cls.iotivity_js_apis_dir)
-        if os.path.exists(cls.nodeunit_zip) and not os.path.exists('/tmp/master.zip'):
-            os.system('mv -f %s /tmp/' % (cls.nodeunit_zip))
 
         cls.tc.target.run('rm -f %s.tar.gz' % cls.target_iotivity_js_apis_dir)
         cls.tc.target.run('rm -fr %s/' % cls.target_iotivity_js_apis_dir)
-        cls.tc.target.run('rm -fr /tmp/nodeunit-master')
-        cls.tc.target.run('rm -f /tmp/master.zip')
 
 
 ##
@@ -0,0 +1,210 @@
+"""
+@file nodeunit_batch.py
+"""
+
+##
+# @addtogroup nodejs nodejs
+# @brief This is nodejs component
+# @{
+# @addtogroup nodeunit_batch nodeunit_batch
+# @brief This is nodeunit_batch module
+# @{
+##
+
+import os
+import glob
+import json
+import hashlib
+import unittest
+
+from oeqa.utils.helper import get_files_dir
+from oeqa.utils.helper import get_native_dir
+
+NODEUNIT_DIR = '/tmp/nodeunit-master'
+REPORTER = os.path.join(os.path.dirname(__file__),
+                        'files', 'nodeunit', 'iotqa_reporter.js')
+TARGET_REPORTER = '%s/lib/reporters/iotqa_reporter.js' % NODEUNIT_DIR
+# prefix of the records printed by iotqa_reporter.js
+MARKER = '@@IOTQA-NODEUNIT@@ '
+
+
+def find_nodeunit_archive():
+    '''
+    Find the pinned nodeunit-<version>.zip deployed with the test files
+    by the nodeunit-archive recipe.
+    @fn find_nodeunit_archive
+    @return path of the archive, None if there is none
+    '''
+    for files_dir in [get_files_dir(), get_native_dir()]:
+        archives = sorted(glob.glob(os.path.join(files_dir, 'nodeunit*.zip')))
+        if archives:
+            return archives[-1]
+    return None
+
+
+def install_nodeunit(target):
+    '''
+    Install nodeunit to NODEUNIT_DIR on the target, only if the same
+    archive is not installed there yet, so that every nodejs suite shares
+    one copy. The marker is checked on every call as a reboot of the
+    target empties /tmp.
+    @fn install_nodeunit
+    @param target
+    @return 0 on success
+    '''
+    archive = find_nodeunit_archive()
+    if not archive:
+        raise unittest.SkipTest('No nodeunit archive in the test files, '
+                                'build nodeunit-archive to deploy it')
+    with open(archive, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    marker = '%s/.iotqa-archive' % NODEUNIT_DIR
+    (status, output) = target.run('cat %s' % marker)
+    if status != 0 or output.strip() != digest:
+        try:
+            target.copy_to(archive, '/tmp/nodeunit.zip')
+        except AssertionError:
+            return 1
+        # the top directory depends on the archive, e.g. nodeunit-0.11.3
+        (status, output) = target.run(
+            'rm -fr /tmp/nodeunit-unzip %s; mkdir /tmp/nodeunit-unzip && '
+            'cd /tmp/nodeunit-unzip && unzip -oq /tmp/nodeunit.zip && '
+            'mv /tmp/nodeunit-unzip/* %s && chmod +x %s/bin/nodeunit && '
+            'echo %s > %s; s=$?; rm -fr /tmp/nodeunit-unzip /tmp/nodeunit.zip; '
+            'exit $s' % (NODEUNIT_DIR, NODEUNIT_DIR, NODEUNIT_DIR,
+                         digest, marker))
+        if status != 0:
+            return 1
+    return 0
+
+
+def parse_nodeunit_records(output):
+    '''
+    Collect the per test records printed by iotqa_reporter.js.
+    @fn parse_nodeunit_records
+    @param output
+    @return dict of test name to record, None if the run did not finish
+    '''
+    records = {}
+    finished = False
+    for line in output.splitlines():
+        if not line.startswith(MARKER):
+            continue
+        try:
+            record = json.loads(line[len(MARKER):])
+        except ValueError:
+            # cut short, e.g. node crashed while printing
+            continue
+        if record.get('done'):
+            finished = True
+        else:
+            records[record['test']] = record
+    return records if records or finished else None
+
+
+def format_nodeunit_result(record):
+    '''
+    Render a record like the default nodeunit reporter does, its last
+    line is 'OK: ...' or 'FAILURES: ...'.
+    @fn format_nodeunit_result
+    @param record
+    @return (status, output) like a single nodeunit run
+    '''
+    lines = [u'%s %s' % (u'\u2717' if record['failures'] else u'\u2714',
+                         record['test'])]
+    lines.extend(record['errors'])
+    if record['failures']:
+        lines.append(u'FAILURES: %d/%d assertions failed (%dms)' %
+                     (record['failures'], record['assertions'],
+                      record['duration']))
+        return (1, u'\n'.join(lines).encode('utf-8'))
+    lines.append(u'OK: %d assertions (%dms)' %
+                 (record['assertions'], record['duration']))
+    return (0, u'\n'.join(lines).encode('utf-8'))
+
+
+class NodeunitBatch(object):
+    '''
+    Run every test of a nodeunit file in one node process and hand out
+    the results test by test, instead of starting node for each test.
+    A test without a record, e.g. because node crashed on an earlier
+    test, runs on its own as before, and so do failed tests when
+    rerun_failures is set, to get their diagnostics from a clean run.
+    @class NodeunitBatch
+    '''
+
+    def __init__(self, target, test_dir, env='', rerun_failures=False):
+        self.target = target
+        self.test_dir = test_dir
+        self.env = env
+        self.rerun_failures = rerun_failures
+        self.results = {}
+        self.reporter = None
+
+    def install_reporter(self):
+        '''
+        Copy the reporter next to the built-in nodeunit reporters.
+        @fn install_reporter
+        @param self
+        @return
+        '''
+        try:
+            (status, output) = self.target.copy_to(REPORTER, TARGET_REPORTER)
+        except AssertionError:
+            status = 1
+        self.reporter = TARGET_REPORTER if status == 0 else None
+        return status
+
+    def _nodeunit_cmd(self, js_file, options):
+        return '%scd %s/; %s/bin/nodeunit %s/%s %s' % (
+            self.env, self.test_dir, NODEUNIT_DIR, self.test_dir, js_file,
+            options)
+
+    def run_file(self, js_file):
+        '''
+        Run all tests of js_file at once and keep their records.
+        @fn run_file
+        @param self
+        @param js_file
+        @return
+        '''
+        records = None
+        if self.reporter:
+            (status, output) = self.target.run(
+                self._nodeunit_cmd(js_file, '--reporter %s' % self.reporter))
+            records = parse_nodeunit_records(output)
+        self.results[js_file] = records or {}
+
+    def run_single(self, js_file, test_name):
+        '''
+        Run one test in its own node process.
+        @fn run_single
+        @param self
+        @param js_file
+        @param test_name
+        @return (status, output)
+        '''
+        return self.target.run(
+            self._nodeunit_cmd(js_file, '-t %s' % test_name))
+
+    def get_result(self, js_file, test_name):
+        '''
+        Result of one test, running its whole file on first use.
+        @fn get_result
+        @param self
+        @param js_file
+        @param test_name
+        @return (status, output) like a single nodeunit run
+        '''
+        if js_file not in self.results:
+            self.run_file(js_file)
+        record = self.results[js_file].get(test_name)
+        if record is None or \
+           (record['failures'] and self.rerun_failures):
+            return self.run_single(js_file, test_name)
+        return format_nodeunit_result(record)
+
+##
+# @}
+# @}
+##
@@ -15,11 +15,13 @@ import os
 import glob
 import time
 import json
-import subprocess
 
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.decorators import tag
 from oeqa.utils.helper import get_files_dir
+from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.metrics import record_metric
+from oeqa.utils.restclient import RestClient
 
 
 @tag(TestType='EFT', FeatureID='IOTOS-343')
@@ -43,6 +45,8 @@ class RESTAPIAppTest(oeRuntimeTest):
 
     rest_api_home = "/usr/lib/node_modules/iot-rest-api-server"
     rest_api_log = "/tmp/rest_api_server.log"
+    rest_api_port = 8000
+    client = None
     appId = "%s:%s" % (test_app_name, test_app_name)
 
     """ App Framework testing for M2 rqts"""
@@ -182,27 +186,21 @@ class RESTAPIAppTest(oeRuntimeTest):
              return None
 
 
-    def _run_curl_cmd(self, method, path, appId = None):
-        '''Send HTTP request via curl command tool, please disable all the proxy configration.
-        @fn _run_curl_cmd
+    def _send_request(self, method, path, appId = None):
+        '''Send HTTP request to the REST API server over the kept-alive
+        connection of the class, no proxy is used.
+        @fn _send_request
         @param self
         @param  method
         @param  path
         @param  appId 
-        @return
+        @return RestResponse with status, headers, body, json() and latency
         '''
         if appId:
             apps_install = appId
         else:
             apps_install = ''
-        curl_cmd = ['curl', '-X', method, '--noproxy', '"*"', '-w', '%{http_code}', '--no-buffer', 'http://%s:8000/api/%s%s' % (self.target.ip, path, apps_install)]
-        p = subprocess.Popen(curl_cmd, stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
-        p.wait()
-
-        ret = p.returncode
-        output = p.stdout.read()
-
-        return (ret, output)
+        return self.client.request(method, '%s%s' % (path, apps_install))
 
 
     @classmethod
@@ -215,9 +213,19 @@ class RESTAPIAppTest(oeRuntimeTest):
         (_, output) = cls.tc.target.run("ps | grep -v grep | grep 'node index.js'")
         if not 'node index.js' in output:
             print('starting rest api server...')
+            start = time.time()
             cls.tc.target.run("su -l %s -c 'cd %s;node index.js > %s 2>&1 &'" %
                          (cls.test_app_user, cls.rest_api_home, cls.rest_api_log))
-            time.sleep(20)
+            # poll instead of sleeping, 20s is still the upper bound
+            elapsed = cls.client.wait_until_ready(timeout=20)
+            if elapsed is None:
+                print('rest api server is not answering after 20s')
+            else:
+                startup = time.time() - start
+                collect_pnp_log('rest_api_startup', 'rest_api_startup',
+                                '%.2fs' % startup)
+                record_metric('rest_api_startup', startup, 's')
+                print('rest api server ready in %.2fs' % startup)
 
 
     @classmethod
@@ -242,6 +250,7 @@ class RESTAPIAppTest(oeRuntimeTest):
         @param cls
         @return
         '''
+        cls.client = RestClient(cls.tc.target.ip, cls.rest_api_port)
         cls._installApp()
         cls._launch_rest_api_server()
         cls._stopApp()
@@ -254,6 +263,8 @@ class RESTAPIAppTest(oeRuntimeTest):
         @param cls
         @return
         '''
+        if cls.client:
+            cls.client.close()
         cls._stop_rest_api_server()
 
 
@@ -316,12 +327,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Now all the apps running
         print('\ntesting POST to start all installed apps...')
-        (returncode, output) = self._run_curl_cmd('POST', 'apps')
-        self.show_ouput(output)
+        response = self._send_request('POST', 'apps')
+        self.show_ouput(response)
         ##
         # TESTPOINT: #2, test_api_apps
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -332,16 +343,16 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Get the running apps list
         print('\ntesting GET to list all running apps...')
-        (returncode, output) = self._run_curl_cmd('GET', 'apps')
-        self.show_ouput(output)
+        response = self._send_request('GET', 'apps')
+        self.show_ouput(response)
         ##
         # TESTPOINT: #4, test_api_apps
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         ##
         # TESTPOINT: #5, test_api_apps
         #
-        self.assertTrue(('%s' % self.appId) in output)
+        self.assertTrue(('%s' % self.appId) in response.body)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -352,12 +363,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Now restart all the running apps
         print('\ntesting PUT to restart all running apps...')
-        (_, output) = self._run_curl_cmd('PUT', 'apps')
-        self.show_ouput(output)
+        response = self._send_request('PUT', 'apps')
+        self.show_ouput(response)
         ##
         # TESTPOINT: #7, test_api_apps
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -368,12 +379,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # # Now stop all the running apps
         print('\ntesting DELETE all running apps ...')
-        (_, output) = self._run_curl_cmd('DELETE', 'apps')
-        self.show_ouput(output)
+        response = self._send_request('DELETE', 'apps')
+        self.show_ouput(response)
         ##
         # TESTPOINT: #9, test_api_apps
         #
-        self.assertTrue(output.strip().endswith('200'))        
+        self.assertEqual(response.status, 200)        
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -393,16 +404,16 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Get the running app
         print('\ntesting GET to list single app...')
-        (returncode, output) = self._run_curl_cmd('GET', 'apps', '/%s' % self.appId)
-        self.show_ouput(output)               
+        response = self._send_request('GET', 'apps', '/%s' % self.appId)
+        self.show_ouput(response)               
         ##
         # TESTPOINT: #1, test_api_apps_with_appid
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         ##
         # TESTPOINT: #2, test_api_apps_with_appid
         #
-        self.assertTrue(('%s' % self.appId) in output)
+        self.assertTrue(('%s' % self.appId) in response.body)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -413,12 +424,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Now restart the running app
         print('\ntesting PUT to restart single app...')
-        (_, output) = self._run_curl_cmd('PUT', 'apps', '/%s' % self.appId)
-        self.show_ouput(output)        
+        response = self._send_request('PUT', 'apps', '/%s' % self.appId)
+        self.show_ouput(response)        
         ##
         # TESTPOINT: #4, test_api_apps_with_appid
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -429,12 +440,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Now stop the running app
         print('\ntesting DELETE to stop single app...')
-        (_, output) = self._run_curl_cmd('DELETE', 'apps', '/%s' % self.appId)
-        self.show_ouput(output)       
+        response = self._send_request('DELETE', 'apps', '/%s' % self.appId)
+        self.show_ouput(response)       
         ##
         # TESTPOINT: #6, test_api_apps_with_appid
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -445,12 +456,12 @@ class RESTAPIAppTest(oeRuntimeTest):
 
         # Now start the single app
         print('\ntesting POST to start single app...')
-        (returncode, output) = self._run_curl_cmd('POST', 'apps', '/%s' % self.appId)
-        self.show_ouput(output)
+        response = self._send_request('POST', 'apps', '/%s' % self.appId)
+        self.show_ouput(response)
         ##
         # TESTPOINT: #8, test_api_apps_with_appid
         #
-        self.assertTrue(output.strip().endswith('200'))
+        self.assertEqual(response.status, 200)
         (_, output) = self.get_target_running_apps()
         self.show_ouput(output)
         ##
@@ -22,6 +22,9 @@ import subprocess
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.decorators import tag
 
+from nodeunit_batch import NodeunitBatch
+from nodeunit_batch import install_nodeunit
+
 
 @tag(TestType='FVT', FeatureID='IOTOS-343')
 class RESTAPITest(oeRuntimeTest):
@@ -33,7 +36,7 @@ class RESTAPITest(oeRuntimeTest):
     files_dir = None
     rest_api_dir = None
     target_rest_api_dir = '/tmp/%s' % rest_api
-    nodeunit_zip = None
+    nodeunit = None
     rest_api_js_files = {
 
         'api_system': 'nodeunit_test_api_system.js',
@@ -100,24 +103,29 @@ class RESTAPITest(oeRuntimeTest):
                                 os.path.dirname(cls.target_rest_api_dir))
                             )
 
-        # Download nodeunit from git hub
-        proc = subprocess.Popen(['wget', 'https://github.com/caolan/nodeunit/archive/master.zip'],
-                                cwd = cls.files_dir)
-        proc.wait()
-
-        cls.nodeunit_zip = os.path.join(os.path.dirname(__file__),
-                                    'files',
-                                    'master.zip')
-        if os.path.exists(cls.nodeunit_zip):
-            cls.tc.target.copy_to(cls.nodeunit_zip, '/tmp/master.zip')
-            cls.tc.target.run('cd /tmp/; ' \
-                            'unzip -oq master.zip;' \
-                            'chmod +x /tmp/nodeunit-master/bin/nodeunit'
-                           )
+        # nodeunit is shared by the nodejs suites
+        install_nodeunit(cls.tc.target)
 
         for api, api_js in cls.rest_api_js_files.items():
             cls.tc.target.run('cd %s; node %s' % (cls.target_rest_api_dir, api_js) )
 
+        # Each test file runs once, the tests look up their own result.
+        cls.nodeunit = NodeunitBatch(cls.tc.target, cls.target_rest_api_dir)
+        cls.nodeunit.install_reporter()
+
+
+    def _run_nodeunit_test(self, api, test_name):
+        '''
+        Result of one nodeunit test of the api test file.
+        @fn _run_nodeunit_test
+        @param self
+        @param api
+        @param test_name
+        @return (status, output) of the test
+        '''
+        return self.nodeunit.get_result(self.rest_api_js_files[api],
+                                        test_name)
+
 
     def test_api_system_status_code(self):
         '''
@@ -126,13 +134,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemStatusCode' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemStatusCode')
         ##
         # TESTPOINT: #1, test_api_system_status_code
         #
@@ -150,13 +153,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemHostnameNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemHostnameNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_hostname
         #
@@ -174,13 +172,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemHostnameType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemHostnameType')
         ##
         # TESTPOINT: #1, test_api_system_hostname_type
         #
@@ -198,13 +191,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemHostnameValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemHostnameValue')
         ##
         # TESTPOINT: #1, test_api_system_hostname_value
         #
@@ -222,13 +210,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTypeNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTypeNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_type
         #
@@ -246,13 +229,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTypeType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTypeType')
         ##
         # TESTPOINT: #1, test_api_system_type_type
         #
@@ -270,13 +248,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTypeValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTypeValue')
         ##
         # TESTPOINT: #1, test_api_system_type_value
         #
@@ -294,13 +267,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemArchNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemArchNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_arch
         #
@@ -318,13 +286,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemArchType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemArchType')
         ##
         # TESTPOINT: #1, test_api_system_arch_type
         #
@@ -342,13 +305,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemArchValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemArchValue')
         ##
         # TESTPOINT: #1, test_api_system_arch_value
         #
@@ -366,13 +324,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemReleaseNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemReleaseNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_release
         #
@@ -390,13 +343,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemReleaseType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemReleaseType')
         ##
         # TESTPOINT: #1, test_api_system_release_type
         #
@@ -414,13 +362,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemReleaseValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemReleaseValue')
         ##
         # TESTPOINT: #1, test_api_system_release_value
         #
@@ -438,13 +381,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemUptimeNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemUptimeNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_uptime
         #
@@ -462,13 +400,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemUptimeType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemUptimeType')
         ##
         # TESTPOINT: #1, test_api_system_uptime_type
         #
@@ -486,13 +419,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemLoadavgNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemLoadavgNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_loadavg
         #
@@ -510,13 +438,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemLoadavgType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemLoadavgType')
         ##
         # TESTPOINT: #1, test_api_system_loadavg_type
         #
@@ -534,13 +457,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTotalmemNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTotalmemNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_totalmem
         #
@@ -558,13 +476,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTotalmemType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTotalmemType')
         ##
         # TESTPOINT: #1, test_api_system_totalmem_type
         #
@@ -582,13 +495,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemTotalmemValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemTotalmemValue')
         ##
         # TESTPOINT: #1, test_api_system_totalmem_value
         #
@@ -606,13 +514,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemFreememNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemFreememNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_freemem
         #
@@ -630,13 +533,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemFreememType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemFreememType')
         ##
         # TESTPOINT: #1, test_api_system_freemem_type
         #
@@ -654,13 +552,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemCpusNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemCpusNotNull')
         ##
         # TESTPOINT: #1, test_api_system_has_cpus
         #
@@ -678,13 +571,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemCpusType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemCpusType')
         ##
         # TESTPOINT: #1, test_api_system_cpus_type
         #
@@ -702,13 +590,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemCpusValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemCpusValue')
         ##
         # TESTPOINT: #1, test_api_system_cpus_value
         #
@@ -727,13 +610,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiSystemNetworkInterfacesValue' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_system']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_system', 'testApiSystemNetworkInterfacesValue')
         ##
         # TESTPOINT: #1, test_api_system_networkinterfaces_value
         #
@@ -751,13 +629,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDStatusCode' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDStatusCode')
         ##
         # TESTPOINT: #1, test_api_oic_d_status_code
         #
@@ -775,13 +648,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredNNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredNNotNull')
         ##
         # TESTPOINT: #1, test_api_oic_d_has_required_n
         #
@@ -799,13 +667,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredNType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredNType')
         ##
         # TESTPOINT: #1, test_api_oic_d_required_n_type
         #
@@ -823,13 +686,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredDiNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredDiNotNull')
         ##
         # TESTPOINT: #1, test_api_oic_d_has_required_di
         #
@@ -847,13 +705,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredDiType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredDiType')
         ##
         # TESTPOINT: #1, test_api_oic_d_required_di_type
         #
@@ -871,13 +724,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredDiUuid' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredDiUuid')
         ##
         # TESTPOINT: #1, test_api_oic_d_required_di_value_uuid
         #
@@ -895,13 +743,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDRequiredIcvNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDRequiredIcvNotNull')
         ##
         # TESTPOINT: #1, test_api_oic_d_has_required_icv
         #
@@ -919,13 +762,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicRequiredDIcvType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicRequiredDIcvType')
         ##
         # TESTPOINT: #1, test_api_oic_d_required_icv_type
         #
@@ -943,13 +781,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDOptionalDmvType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDOptionalDmvType')
         ##
         # TESTPOINT: #1, test_api_oic_d_optional_dmv_type
         #
@@ -968,13 +801,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicDOptionalDmvCsv' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_d']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_d', 'testApiOicDOptionalDmvCsv')
         ##
         # TESTPOINT: #1, test_api_oic_d_optional_dmv_value_csv
         #
@@ -992,13 +820,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPStatusCode' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPStatusCode')
         ##
         # TESTPOINT: #1, test_api_oic_p_status_code
         #
@@ -1016,13 +839,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPRequiredPiNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPRequiredPiNotNull')
         ##
         # TESTPOINT: #1, test_api_oic_p_has_required_pi
         #
@@ -1040,13 +858,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPRequiredPiType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPRequiredPiType')
         ##
         # TESTPOINT: #1, test_api_oic_p_required_pi_type
         #
@@ -1064,13 +877,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPRequiredMnmnNotNull' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPRequiredMnmnNotNull')
         ##
         # TESTPOINT: #1, test_api_oic_p_has_required_mnmn
         #
@@ -1088,13 +896,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPRequiredMnmnType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPRequiredMnmnType')
         ##
         # TESTPOINT: #1, test_api_oic_p_required_mnmn_type
         #
@@ -1112,13 +915,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnmlType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnmlType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnml_type
         #
@@ -1136,13 +934,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnmoType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnmoType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnmo_type
         #
@@ -1160,13 +953,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMndtType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMndtType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mndt_type
         #
@@ -1184,13 +972,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnpvType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnpvType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnpv_type
         #
@@ -1208,13 +991,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnosType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnosType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnos_type
         #
@@ -1232,13 +1010,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnhwType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnhwType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnhw_type
         #
@@ -1256,13 +1029,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnfvType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnfvType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnfv_type
         #
@@ -1280,13 +1048,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalMnslType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalMnslType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_mnsl_type
         #
@@ -1304,13 +1067,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicPOptionalStType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_p']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_p', 'testApiOicPOptionalStType')
         ##
         # TESTPOINT: #1, test_api_oic_p_optional_st_type
         #
@@ -1328,13 +1086,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicResStatusCode' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_res']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_res', 'testApiOicResStatusCode')
         ##
         # TESTPOINT: #1, test_api_oic_res_status_code
         #
@@ -1352,13 +1105,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicResNType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_res']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_res', 'testApiOicResNType')
         ##
         # TESTPOINT: #1, test_api_oic_res_n_type
         #
@@ -1376,13 +1124,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicResDiType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_res']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_res', 'testApiOicResDiType')
         ##
         # TESTPOINT: #1, test_api_oic_res_di_type
         #
@@ -1400,13 +1143,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicResDiUuid' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_res']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_res', 'testApiOicResDiUuid')
         ##
         # TESTPOINT: #1, test_api_oic_res_di_value_uuid
         #
@@ -1424,13 +1162,8 @@ class RESTAPITest(oeRuntimeTest):
         @param self
         @return
         '''
-        (api_status, api_output) = self.target.run(
-                'cd %s/; /tmp/nodeunit-master/bin/nodeunit %s/%s -t testApiOicResLinksType' % (
-                    self.target_rest_api_dir,
-                    self.target_rest_api_dir,
-                    self.rest_api_js_files['api_oic_res']
-                   )
-        )
+        (api_status, api_output) = self._run_nodeunit_test(
+                'api_oic_res', 'testApiOicResLinksType')
         ##
         # TESTPOINT: #1, test_api_oic_res_links_type
         #
@@ -1453,13 +1186,9 @@ class RESTAPITest(oeRuntimeTest):
 
         if os.path.exists('%s.tar.gz' % cls.rest_api_dir):
             os.remove('%s.tar.gz' % cls.rest_api_dir)
-        if os.path.exists(cls.nodeunit_zip):
-            os.remove(cls.nodeunit_zip)
 
         cls.tc.target.run('rm -f %s.tar.gz' % cls.target_rest_api_dir)
         cls.tc.target.run('rm -fr %s/' % cls.target_rest_api_dir)
-        cls.tc.target.run('rm -fr /tmp/nodeunit-master')
-        cls.tc.target.run('rm -f /tmp/master.zip')
 
 ##
 # @}
@@ -16,9 +16,11 @@
 
 import os
 import re
-import time
 from oeqa.oetest import oeRuntimeTest
-from oeqa.utils.helper import collect_pnp_log, get_files_dir
+from oeqa.utils.helper import collect_pnp_log, get_files_dir, run_many
+from oeqa.utils.helper import wait_for_boot, reboot_and_wait
+from oeqa.utils.metrics import record_metric
+from oeqa.utils import boottimeline
 
 
 class BootTimeTest(oeRuntimeTest):
@@ -26,6 +28,10 @@ class BootTimeTest(oeRuntimeTest):
     @class BootTimeTest
     """
 
+    # boot ids of the target already measured, a repeat of the test
+    # (runtest.py --pnp-repeat) reboots to measure a boot of its own
+    measured = set()
+
     def _setup(self):
         """Copy systemd-analyze to target device
         @fn _setup
@@ -46,6 +52,21 @@ class BootTimeTest(oeRuntimeTest):
             0,
             msg="Failed to find systemd-analyze command")
 
+    def _new_boot(self):
+        """Reboot unless the current boot was not measured yet
+        @fn _new_boot
+        @param self
+        @return boot id of the boot to measure
+        """
+        boot_id = "/proc/sys/kernel/random/boot_id"
+        (status, output) = self.target.run("cat %s" % boot_id)
+        if output.strip() in self.measured:
+            elapsed = reboot_and_wait(self.target, 300)
+            self.assertIsNotNone(elapsed,
+                                 "Device did not come back from reboot")
+            (status, output) = self.target.run("cat %s" % boot_id)
+        return output.strip()
+
     def _parse_result(self, data):
         """Parse systemd-analyze result to calculate boot time
         boot time = kernel time + userspace time
@@ -64,23 +85,73 @@ class BootTimeTest(oeRuntimeTest):
                 boottime = float(k_time[0]) +float(u_time[0])
         return boottime
 
+    def _profile(self, casename):
+        """Record the activation time of every unit and the critical
+        path of the boot, to see which service made boot slower
+        @fn _profile
+        @param self
+        @param casename
+        @return
+        """
+        show = "systemctl show %s $(systemctl list-units --all " \
+               "--no-legend --no-pager | sed 's/^[^a-zA-Z0-9]*//' | " \
+               "awk '{print $1}')" % " ".join(
+               "-p %s" % p for p in boottimeline.UNIT_PROPERTIES)
+        results = run_many(self.target, [
+            "/tmp/systemd-analyze blame",
+            "/tmp/systemd-analyze critical-chain",
+            "systemctl get-default",
+            "journalctl -b -o short-monotonic --no-pager",
+            show])
+        (blame, chain, target, journal, units) = [r[1] for r in results]
+        blame = boottimeline.parse_blame(blame)
+        units = boottimeline.parse_unit_times(units)
+        path = boottimeline.critical_path(units, target.strip())
+        for (unit, seconds) in sorted(blame.items()):
+            record_metric(casename + "_unit", seconds, "s", {"unit": unit})
+        for (unit, at, took) in path:
+            record_metric(casename + "_critical", took, "s", {"unit": unit})
+
+        collect_pnp_log(casename, casename + "-blame", results[0][1])
+        collect_pnp_log(casename, casename + "-critical-chain", chain)
+        collect_pnp_log(casename, casename + "-timeline",
+                        boottimeline.format_timeline(units))
+        collect_pnp_log(casename, casename + "-critical-path", "\n".join(
+            "%9.3fs +%.3fs %s" % (at, took, unit) for (unit, at, took) in path))
+        collect_pnp_log(casename, casename + "-journal", "\n".join(
+            "%9.3fs %s" % event
+            for event in boottimeline.parse_journal(journal)))
+        return path
+
     def test_boot_time(self):
         """Measure boot time with systemd-analyze
         @fn test_boot_time
         @param self
         @return
         """
+        boot = self._new_boot()
         self._setup()
-        time.sleep(60)
+        # systemd-analyze only answers once the boot finished
+        wait_for_boot(self.target, 60)
         filename = os.path.basename(__file__)
         casename = os.path.splitext(filename)[0]
         (status, output) = self.target.run("/tmp/systemd-analyze time")
+        self.measured.add(boot)
         result = self._parse_result(output)
         boottime = str(result)+"s"
         collect_pnp_log(casename, casename, boottime)
+        if result:
+            record_metric(casename, result, "s")
+            for phase in ["kernel", "userspace"]:
+                match = re.search(r'(\d*\.?\d*)s\s\(%s\)' % phase, output)
+                if match:
+                    record_metric(casename, float(match.group(1)), "s",
+                                  {"phase": phase})
         print "\n%s:%s\n" % (casename, boottime)
         logname = casename + "-systemd-analyze"
         collect_pnp_log(casename, logname, output)
+        path = self._profile(casename)
+        print "critical path: %s" % " -> ".join(u for (u, at, took) in path)
         ##
         # TESTPOINT: #1, test_boot_time
         #
@@ -16,7 +16,9 @@
 
 import os
 from oeqa.oetest import oeRuntimeTest
-from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.helper import collect_pnp_log, reboot_and_wait, stop_agent
+from oeqa.utils.metrics import record_metric
+from oeqa.utils.sampler import idle_window, window_settings
 
 class CPUUsageTest(oeRuntimeTest):
     """CPU consumption for system idle
@@ -30,9 +32,8 @@ class CPUUsageTest(oeRuntimeTest):
         @param self
         @return
         """
-        (status, output) = self.target.run("reboot")
-        time.sleep(120)
-        self.assertEqual(status, 0, output)
+        elapsed = reboot_and_wait(self.target, 120)
+        self.assertIsNotNone(elapsed, "Device did not come back from reboot")
     
     def test_cpuusage(self):
         """Measure system idle CPU usage
@@ -43,26 +44,31 @@ class CPUUsageTest(oeRuntimeTest):
         # self._reboot()
         filename = os.path.basename(__file__)
         casename = os.path.splitext(filename)[0]
-        (status, output) = self.target.run(
-            "top -b -d 10 -n 12 >/tmp/top.log")
-        (status, output) = self.target.run(
-            "cat /tmp/top.log | grep -i 'CPU' | grep 'id*' | "
-            "tail -10 | awk '{print $8}' | "
-            "awk -F '%' '{sum+=$1} END {print sum/NR}'")
-        cpu_idle = float(output)
-        cpu_idle = float("{0:.2f}".format(cpu_idle))
-        cpu_used = str(100 - cpu_idle) + "%"
-        collect_pnp_log(casename, casename, cpu_used)
-        print "\n%s:%s\n" % (casename, cpu_used)
+        # the test agent is not part of the idle system
+        stop_agent(self.target)
+        series = idle_window(self.target, consumer=casename,
+                             **window_settings(oeRuntimeTest.tc.d))
+        usage = series.measurement().cpu_usage()
         ##
         # TESTPOINT: #1, test_cpuusage
         #
-        self.assertEqual(status, 0, cpu_used)
+        self.assertTrue(usage, "No CPU samples in the idle window")
+        busy = float("{0:.2f}".format(
+            sum(u for (t, u) in usage) / len(usage)))
+        cpu_used = str(busy) + "%"
+        collect_pnp_log(casename, casename, cpu_used)
+        record_metric(casename, busy, "%")
+        print "\n%s:%s\n" % (casename, cpu_used)
 
-        (status, output) = self.target.run(
-            "cat /tmp/top.log")
-        logname = casename + "-topinfo"
-        collect_pnp_log(casename, logname, output)
+        logname = casename + "-series"
+        collect_pnp_log(casename, logname, "%s at %.0fs\n%s" % (
+            "settled" if series.settled else "did not settle, measured",
+            series.settled_at, "\n".join(
+            "%.2f %.2f%%" % (t, u) for (t, u) in series.cpu_usage())))
+        if series.overhead:
+            # load of the sampler itself, part of the figures above
+            collect_pnp_log(casename, logname, "sampler: cpu %.2f%% rss %dKB"
+                            % series.overhead)
 
 ##
 # @}
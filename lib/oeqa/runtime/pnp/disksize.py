@@ -19,6 +19,7 @@ import time
 import re
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.metrics import record_metric
 
 class DiskSizeTest(oeRuntimeTest):
     """Disk consumption
@@ -68,11 +69,18 @@ class DiskSizeTest(oeRuntimeTest):
         """
         filename = os.path.basename(__file__)
         casename = os.path.splitext(filename)[0]
+        # files cached by earlier uploads are not part of the image
+        clear_cache = getattr(self.target, "clear_cache", None)
+        if clear_cache:
+            clear_cache()
         (status, output) = self.target.run("df -h")
         logname = casename + "-detail"
         collect_pnp_log(casename, logname, output)
         disksize = self._parse_result(casename,logname)
         collect_pnp_log(casename, casename, disksize)
+        if disksize:
+            scale = 1024 if disksize.endswith("G") else 1
+            record_metric(casename, float(disksize[:-1]) * scale, "MB")
         ##
         # TESTPOINT: #1, test_disksize
         #
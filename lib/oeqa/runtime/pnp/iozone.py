@@ -18,6 +18,7 @@ import os
 import time
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import collect_pnp_log, get_files_dir
+from oeqa.utils.metrics import record_metric
 
 class IOzoneTest(oeRuntimeTest):
     """Use IOzone to measure storage read/write speed
@@ -61,11 +62,13 @@ class IOzoneTest(oeRuntimeTest):
         (status, output) = self.target.run(
             "cat /tmp/iozone-detail.log | tail -4 | "
             "grep '524288'| awk '{print $5/1024}'")
+        read_speed = output
         read_res = "Read: " + output + "MB/s"
         
         (status, output) = self.target.run(
             "cat /tmp/iozone-detail.log | tail -4 | "
             "grep '524288'| awk '{print $3/1024}'")
+        write_speed = output
         write_res = "Write:" + output + "MB/s"
         
         collect_pnp_log(casename, casename, read_res)
@@ -75,6 +78,8 @@ class IOzoneTest(oeRuntimeTest):
         # TESTPOINT: #1, test_iozone
         #
         self.assertEqual(status, 0, read_res)
+        record_metric(casename, float(read_speed), "MB/s", {"op": "read"})
+        record_metric(casename, float(write_speed), "MB/s", {"op": "write"})
 
         (status, output) = self.target.run(
             "cat /tmp/iozone-detail.log")
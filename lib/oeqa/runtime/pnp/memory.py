@@ -15,9 +15,11 @@
 ##
 
 import os
-import time
 from oeqa.oetest import oeRuntimeTest
-from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.helper import collect_pnp_log, read_file, reboot_and_wait
+from oeqa.utils.helper import stop_agent
+from oeqa.utils.metrics import record_metric
+from oeqa.utils.sampler import idle_window, window_settings
 
 
 class MemTest(oeRuntimeTest):
@@ -32,18 +34,23 @@ class MemTest(oeRuntimeTest):
         @param self
         @return
         """
-        (status, output) = self.target.run("reboot")
-        time.sleep(120)
-        self.assertEqual(status, 0, output)
+        elapsed = reboot_and_wait(self.target, 120)
+        self.assertIsNotNone(elapsed, "Device did not come back from reboot")
 
-    def _setup(self):
-        """First set sleep time to 180s (default 300s)
-        @fn _setup
+    def _process_summary(self, series):
+        """Latest memory use of each sampled process, largest PSS first
+        @fn _process_summary
         @param self
+        @param series
         @return
         """
-        (status, output) = self.target.run("sleep 180")
-        self.assertEqual(status, 0, output)
+        latest = [(samples[-1], pid, name)
+                  for (pid, (name, samples)) in series.procs.items()
+                  if samples]
+        latest.sort(key=lambda x: x[0][3], reverse=True)
+        return "\n".join("%d %s: rss=%dKB pss=%dKB uss=%dKB" %
+                         (pid, name, s[2], s[3], s[4])
+                         for (s, pid, name) in latest)
 
     def test_mem(self):
         """Mem_Used = Mem_Total - Mem_Available
@@ -52,27 +59,38 @@ class MemTest(oeRuntimeTest):
         @return
         """
         # self._reboot()
-        self._setup()
         filename = os.path.basename(__file__)
         casename = os.path.splitext(filename)[0]
-        (status, output) = self.target.run(
-            "cat /proc/meminfo" " | grep 'MemTotal' | awk '{print $2}'")
-        mem_total = int(output)
-        (status, output) = self.target.run(
-            "cat /proc/meminfo" " | grep 'MemAvailable' | awk '{print $2}'")
-        mem_available = int(output)
-        mem_used = str(mem_total - mem_available) + "KB"
+        # the idle window replaces the former 180s sleep
+        # the test agent is not part of the idle system
+        stop_agent(self.target)
+        series = idle_window(self.target, consumer=casename,
+                             **window_settings(oeRuntimeTest.tc.d))
+        used_series = series.mem_used()
+        used = series.measurement().mem_used()[-1][1]
+        mem_used = str(used) + "KB"
         collect_pnp_log(casename, casename, mem_used)
+        record_metric(casename, used, "KB")
         print "\n%s:%s\n" % (casename, mem_used)
+        (status, meminfo) = read_file(self.target, "/proc/meminfo")
         ##
         # TESTPOINT: #1, test_mem
         #
         self.assertEqual(status, 0, mem_used)
 
-        (status, output) = self.target.run(
-            "cat /proc/meminfo")
         logname = casename + "-meminfo"
-        collect_pnp_log(casename, logname, output)
+        collect_pnp_log(casename, logname, meminfo)
+        logname = casename + "-series"
+        collect_pnp_log(casename, logname, "%s at %.0fs\n%s" % (
+            "settled" if series.settled else "did not settle, measured",
+            series.settled_at, "\n".join(
+            "%.2f %dKB" % (t, kb) for (t, kb) in used_series)))
+        if series.overhead:
+            # load of the sampler itself, part of the figures above
+            collect_pnp_log(casename, logname, "sampler: cpu %.2f%% rss %dKB"
+                            % series.overhead)
+        logname = casename + "-processes"
+        collect_pnp_log(casename, logname, self._process_summary(series))
 
 ##
 # @}
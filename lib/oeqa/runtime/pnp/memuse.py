@@ -0,0 +1,245 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""
+@file memuse.py
+"""
+
+##
+# @addtogroup pnp pnp
+# @brief This is pnp component
+# @{
+# @addtogroup memuse memuse
+# @brief This is memuse module
+# @{
+##
+
+import os
+import re
+from oeqa.oetest import oeRuntimeTest
+from oeqa.utils.helper import collect_pnp_log, get_files_dir, run_many
+from oeqa.utils.helper import stop_agent
+from oeqa.utils.restclient import RestClient
+from oeqa.utils.metrics import record_metric, get_store
+from oeqa.utils.regression import mean, confidence_interval
+
+
+class MemUseTest(oeRuntimeTest):
+    """Memory footprint of the key daemons
+    @class MemUseTest
+    """
+
+    # name recorded -> regular expression matching the command line
+    processes = [
+        ("connmand", r"(^|/)connmand( |$)"),
+        ("bluetoothd", r"(^|/)bluetoothd( |$)"),
+        ("iot-rest-api-server", r"(^|/)node index\.js"),
+    ]
+    # smaps fields summed per process, in kB
+    fields = ["Rss", "Pss", "Private_Clean", "Private_Dirty", "Swap"]
+    # growth against the baseline flagged, relative to its mean
+    growth = 0.05
+    rest_api_home = "/usr/lib/node_modules/iot-rest-api-server"
+    rest_api_log = "/tmp/rest_api_server.log"
+
+    def setUp(self):
+        """Start the REST API server unless it is running, as the
+        previous pnp test may have stopped it
+        @fn setUp
+        @param self
+        @return
+        """
+        self.started = False
+        if "iot-rest-api-server" in self._find_processes(self.processes):
+            return
+        self.target.run("cd %s; node index.js > %s 2>&1 &" %
+                        (self.rest_api_home, self.rest_api_log))
+        self.started = True
+        client = RestClient(self.target.ip)
+        try:
+            ready = client.wait_until_ready(timeout=20)
+        finally:
+            client.close()
+        self.assertIsNotNone(ready, "REST API server is not answering")
+
+    def tearDown(self):
+        """Stop the REST API server if this test started it
+        @fn tearDown
+        @param self
+        @return
+        """
+        if not self.started:
+            return
+        pids = self._find_processes(self.processes).get(
+            "iot-rest-api-server", [])
+        if pids:
+            self.target.run("kill %s" % " ".join(str(p) for p in pids))
+
+    def _get_processes(self):
+        """processes, plus the iotivity servers listed by path or name in
+        PNP_MEMUSE_IOTIVITY. The servers are matched on the executable
+        only, so the example clients and servers other suites leave
+        running under /opt/iotivity are not counted.
+        @fn _get_processes
+        @param self
+        @return list of (name, pattern)
+        """
+        servers = oeRuntimeTest.tc.d.getVar("PNP_MEMUSE_IOTIVITY", True)
+        processes = list(self.processes)
+        for server in (servers or "").split():
+            if "/" in server:
+                pattern = r"^%s( |$)" % re.escape(server)
+            else:
+                pattern = r"^(\S*/)?%s( |$)" % re.escape(server)
+            processes.append(("iotivity-" + os.path.basename(server),
+                              pattern))
+        return processes
+
+    def _find_processes(self, processes):
+        """pids of the running processes of each name in processes
+        @fn _find_processes
+        @param self
+        @param processes
+        @return
+        """
+        (status, output) = self.target.run(
+            "for p in /proc/[0-9]*; do "
+            "c=$(tr '\\0\\n' '  ' < $p/cmdline 2>/dev/null); "
+            "[ -n \"$c\" ] && echo \"${p#/proc/} $c\"; done")
+        found = {}
+        for line in output.splitlines():
+            (pid, cmdline) = (line.split(" ", 1) + [""])[:2]
+            if not pid.isdigit():
+                continue
+            for (name, pattern) in processes:
+                if re.search(pattern, cmdline.strip()):
+                    found.setdefault(name, []).append(int(pid))
+                    break
+        return found
+
+    def _footprint(self, pids):
+        """Sum of the smaps fields over pids, USS being the private part
+        @fn _footprint
+        @param self
+        @param pids
+        @return dict of kB values, None if every process exited
+        """
+        results = run_many(self.target, [
+            "f=/proc/%d/smaps_rollup; [ -e $f ] || f=/proc/%d/smaps; "
+            "awk '/^(%s):/ {s[$1]+=$2} END {for (k in s) print k, s[k]}' $f"
+            % (pid, pid, "|".join(self.fields)) for pid in pids])
+        total = dict.fromkeys(self.fields, 0)
+        counted = 0
+        for (status, output, elapsed) in results:
+            if status != 0 or not output:
+                continue
+            counted += 1
+            for line in output.splitlines():
+                (key, value) = line.split()
+                total[key.rstrip(":")] += int(value)
+        if not counted:
+            return None
+        total["Uss"] = total["Private_Clean"] + total["Private_Dirty"]
+        return total
+
+    def _check_growth(self, name, unit, tags, value):
+        """Compare value with the runs of the baseline build
+        @fn _check_growth
+        @param self
+        @param name
+        @param unit
+        @param tags
+        @param value
+        @return message if the footprint grew, else None
+        """
+        baseline = oeRuntimeTest.tc.d.getVar("PNP_BASELINE", True)
+        if not baseline:
+            return None
+        store = get_store()
+        base = [v for (run, v, u) in store.query(name, tags,
+                machine=store.metadata.get("MACHINE", ""), build=baseline)
+                if u == unit]
+        if not base:
+            return None
+        limit = mean(base) * (1 + self.growth)
+        if len(base) > 1:
+            limit = max(limit, mean(base) + confidence_interval(base))
+        if value > limit:
+            return "%s %s grew from %.0f%s to %.0f%s" % (tags["process"],
+                   tags["type"], mean(base), unit, value, unit)
+        return None
+
+    def _run_memuse(self, casename):
+        """Log the estimate of the memuse tool when it is deployed
+        @fn _run_memuse
+        @param self
+        @param casename
+        @return
+        """
+        memuse = os.path.join(get_files_dir(), "memuse")
+        if not os.path.isfile(memuse):
+            return
+        try:
+            self.target.copy_to(memuse, "/tmp/memuse")
+        except AssertionError:
+            return
+        (status, output) = self.target.run("/tmp/memuse")
+        collect_pnp_log(casename, casename + "-memuse", output)
+
+    def test_memuse(self):
+        """Measure PSS and USS of the key daemons
+        @fn test_memuse
+        @param self
+        @return
+        """
+        filename = os.path.basename(__file__)
+        casename = os.path.splitext(filename)[0]
+        # the test agent is not part of the measured system
+        stop_agent(self.target)
+        self._run_memuse(casename)
+        processes = self._get_processes()
+        found = self._find_processes(processes)
+        results = []
+        grown = []
+        for (name, pattern) in processes:
+            if name not in found:
+                results.append("%s: not running" % name)
+                continue
+            usage = self._footprint(found[name])
+            if usage is None:
+                results.append("%s: exited" % name)
+                continue
+            results.append("%s: pids=%s pss=%dKB uss=%dKB rss=%dKB "
+                           "swap=%dKB" % (name, ",".join(str(p) for p in
+                           found[name]), usage["Pss"], usage["Uss"],
+                           usage["Rss"], usage["Swap"]))
+            for kind in ["Pss", "Uss"]:
+                tags = {"process": name, "type": kind.lower()}
+                message = self._check_growth(casename, "KB", tags,
+                                             usage[kind])
+                record_metric(casename, usage[kind], "KB", tags)
+                if message:
+                    grown.append(message)
+
+        skipped = [name for (name, pattern) in processes
+                   if name not in found]
+        if len(processes) == len(self.processes):
+            skipped.append("iotivity servers (PNP_MEMUSE_IOTIVITY not set)")
+        if skipped:
+            results.append("skipped: %s" % ", ".join(skipped))
+        collect_pnp_log(casename, casename, "\n".join(results))
+        print "\n%s:\n%s\n" % (casename, "\n".join(results))
+        if grown:
+            collect_pnp_log(casename, casename + "-growth", "\n".join(grown))
+            print "Footprint grew against the baseline:\n%s" % \
+                  "\n".join(grown)
+        ##
+        # TESTPOINT: #1, test_memuse
+        #
+        self.assertTrue(found, "None of %s is running" %
+                        ", ".join(name for (name, pattern) in processes))
+
+##
+# @}
+# @}
+##
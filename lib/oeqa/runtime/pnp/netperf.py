@@ -17,6 +17,7 @@
 import os
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import collect_pnp_log, shell_cmd, get_files_dir
+from oeqa.utils.metrics import record_metric
 
 class NetperfTest(oeRuntimeTest):
     """Use netperf to measure the network speed
@@ -68,6 +69,7 @@ class NetperfTest(oeRuntimeTest):
         # TESTPOINT: #1, test_netperf
         #
         self.assertEqual(status, 0, netperf_res)
+        record_metric(casename, float(output), "Mb/s")
 
         (status, output) = self.target.run(
             "cat /tmp/netperf-detail.log")
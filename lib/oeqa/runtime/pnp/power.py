@@ -18,6 +18,8 @@ import os
 import time
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import collect_pnp_log, shell_cmd_timeout
+from oeqa.utils.helper import reboot_and_wait
+from oeqa.utils.metrics import record_metric
 
 class PowerTest(oeRuntimeTest):
     """Use Daxin power monitor to measure system idle power
@@ -31,10 +33,7 @@ class PowerTest(oeRuntimeTest):
         @param self
         @return
         """
-        (status, output) = self.target.run("reboot &")
-        time.sleep(100)
-        ret = shell_cmd_timeout("ping -c 1 %s" %self.target.ip, 4)[0]
-        if ret != 0:
+        if reboot_and_wait(self.target, 300) is None:
             return False
         else:
             time.sleep(10)
@@ -63,6 +62,7 @@ class PowerTest(oeRuntimeTest):
         #
         self.assertEqual(status, 0, output)
         collect_pnp_log(casename, casename, output)
+        record_metric(casename, float(output), "W")
         print "\n%s:%s\n" % (casename, output)
 
         (status, output) = shell_cmd_timeout(
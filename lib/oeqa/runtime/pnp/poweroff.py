@@ -19,6 +19,7 @@ import serial
 import time
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.metrics import record_metric
 
 class PoweroffTest(oeRuntimeTest):
     """The case will measure power off time,
@@ -54,6 +55,7 @@ class PoweroffTest(oeRuntimeTest):
 
         poweroff_t = str(float(time_p)/1000.0) + "s"
         collect_pnp_log(casename, casename, poweroff_t)
+        record_metric(casename, float(time_p)/1000.0, "s")
         print "\n%s:%s\n" % (casename, poweroff_t)
         ##
         # TESTPOINT: #1, test_poweroff
@@ -15,10 +15,11 @@
 ##
 
 import os
-import time
-from datetime import datetime
 from oeqa.oetest import oeRuntimeTest
-from oeqa.utils.helper import collect_pnp_log
+from oeqa.utils.helper import collect_pnp_log, wait_for_boot
+from oeqa.utils.metrics import record_metric
+from oeqa.utils.rebootengine import RebootEngine, RebootError, PHASES
+from oeqa.utils.rebootengine import summarize, format_summary
 
 class RebootTimeTest(oeRuntimeTest):
     """The case will measure system reboot time
@@ -26,56 +27,83 @@ class RebootTimeTest(oeRuntimeTest):
     """
 
     
+    def _login_time(self, start):
+        """Seconds from start, target time of the reboot command, until
+        the boot started the login service, which is what reboottime
+        measured before the ssh probes
+        @fn _login_time
+        @param self
+        @param start
+        @return None if the journal has no such entry
+        """
+        wait_for_boot(self.target, 60)
+        (status, output) = self.target.run(
+            "journalctl -b -o short-unix --no-pager | "
+            "grep -m1 'Starting Login'")
+        try:
+            return float(output.split()[0]) - start
+        except (IndexError, ValueError):
+            return None
+
     def test_reboottime(self):
-        """Measure system reboot time
+        """Measure system reboot time over PNP_REBOOT_CYCLES reboots
+        (default 1), split into shutdown, firmware and kernel, and the
+        time from network up to sshd up. reboottime keeps the former
+        definition, up to the start of the login service,
+        reboottime_ssh is the time until sshd answered.
         @fn test_reboottime
         @param self
         @return
         """
         filename = os.path.basename(__file__)
         casename = os.path.splitext(filename)[0]
-        (status, out)=self.target.run('date +"%m-%d %H:%M:%S"; reboot &')
-        print "\nReboot start time: %s\n" % (out)
-        start_t = datetime.strptime(out,"%m-%d %H:%M:%S")
-        #print start_t
-        time.sleep(60)
-        
-        (status, out)=self.target.run("journalctl -b -a >/tmp/system.log")
-        ##
-        # TESTPOINT: #1, test_reboottime
-        #
-        self.assertEqual(status, 0, msg="Error messages: %s" % out)
-        (status, out)=self.target.run(" cat /tmp/system.log | "
-                "grep 'Starting Login' | "
-                "awk '{print $1, $2, $3}'")
-        ##
-        # TESTPOINT: #2, test_reboottime
-        #
-        self.assertEqual(status, 0, msg="Error messages: %s" % out)
- 
-        print "\nReboot end time: %s\n" % (out)
-        end_t = datetime.strptime(out,"%b %d %H:%M:%S")
-        #print end_t
-        used_t = end_t -start_t
-        reboot_time = used_t.total_seconds()
-        reboot_time_str = str(reboot_time) + "s"
-       
-        if(reboot_time <= 0):
-            print "please check system date:\n"
-            print reboot_time_str
-            ##
-            # TESTPOINT: #3, test_reboottime
-            #
-            self.assertEqual(-1, 0, reboot_time_str)
-        else:
-            collect_pnp_log(casename, casename, reboot_time_str)
-            print "\n%s:%s\n" % (casename, reboot_time_str)
+        cycles = int(oeRuntimeTest.tc.d.getVar("PNP_REBOOT_CYCLES", True)
+                     or 1)
+        ssh_name = casename + "_ssh"
+        engine = RebootEngine(self.target)
+        results = []
+        login_times = []
+        for cnt in range(cycles):
+            (status, start) = self.target.run("date +%s")
+            try:
+                results.append(engine.reboot())
+                error = None
+            except RebootError as e:
+                error = str(e)
             ##
-            # TESTPOINT: #4, test_reboottime
+            # TESTPOINT: #1, test_reboottime
             #
-            self.assertEqual(status, 0, reboot_time_str)
-
+            self.assertIsNone(error, msg="Error messages: %s" % error)
+            phases = results[-1].phases()
+            for phase in PHASES:
+                record_metric(ssh_name, phases[phase], "s", {"phase": phase})
+            login = self._login_time(float(start))
+            if login is not None and login > 0:
+                login_times.append(login)
+            collect_pnp_log(casename, casename + "-detail", "%s login=%s" %
+                            (results[-1], "%.2fs" % login
+                             if login is not None else "-"))
 
+        ssh_time = summarize(results)["total"][1]
+        collect_pnp_log(casename, casename + "-ssh", "%.2fs" % ssh_time)
+        record_metric(ssh_name, ssh_time, "s")
+        collect_pnp_log(casename, casename + "-detail",
+                        format_summary(results))
+        print format_summary(results)
+        if login_times:
+            reboot_time = sum(login_times) / len(login_times)
+            reboot_time_str = str(reboot_time) + "s"
+            collect_pnp_log(casename, casename, reboot_time_str)
+            record_metric(casename, reboot_time, "s")
+        else:
+            reboot_time = 0.0
+            reboot_time_str = "no 'Starting Login' in the journal"
+        print "\n%s:%s\n%s:%.2fs\n" % (casename, reboot_time_str,
+                                        ssh_name, ssh_time)
+        ##
+        # TESTPOINT: #2, test_reboottime
+        #
+        self.assertTrue(reboot_time > 0, reboot_time_str)
 
 ##
 # @}
@@ -0,0 +1,226 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""
+@file restapi_load.py
+"""
+
+##
+# @addtogroup pnp pnp
+# @brief This is pnp component
+# @{
+# @addtogroup restapi_load restapi_load
+# @brief This is restapi_load module
+# @{
+##
+
+import os
+import math
+import time
+import socket
+import httplib
+import threading
+from oeqa.oetest import oeRuntimeTest
+from oeqa.utils.helper import collect_pnp_log, run_many
+from oeqa.utils.restclient import RestClient
+from oeqa.utils.metrics import record_metric
+
+
+def percentile(values, pct):
+    """Nearest rank percentile of sorted values
+    @fn percentile
+    @param values
+    @param pct
+    @return
+    """
+    if not values:
+        return 0.0
+    rank = int(math.ceil(pct / 100.0 * len(values))) - 1
+    return values[min(max(rank, 0), len(values) - 1)]
+
+
+class RESTAPILoadTest(oeRuntimeTest):
+    """Latency and throughput of the iot-rest-api-server under load
+    @class RESTAPILoadTest
+    """
+
+    rest_api_home = "/usr/lib/node_modules/iot-rest-api-server"
+    rest_api_log = "/tmp/rest_api_server.log"
+    endpoints = ["system", "oic/d", "oic/p", "oic/res", "apps"]
+    # defaults, REST_LOAD_CONCURRENCY and REST_LOAD_DURATION override them
+    concurrency = 4
+    duration = 60
+
+    def _get_setting(self, name, default):
+        """Integer setting from the build data, else default
+        @fn _get_setting
+        @param self
+        @param name
+        @param default
+        @return
+        """
+        value = oeRuntimeTest.tc.d.getVar(name, True)
+        return int(value) if value else default
+
+    def _server_pid(self):
+        """pid of the node index.js process, None if it is not running
+        @fn _server_pid
+        @param self
+        @return
+        """
+        (status, output) = self.target.run(
+            "ps | grep -v grep | grep 'node index.js' | awk 'NR==1 {print $1}'")
+        return output.strip() or None
+
+    def _server_usage(self, pid):
+        """CPU ticks used so far, uptime, current and peak RSS in kB
+        @fn _server_usage
+        @param self
+        @param pid
+        @return
+        """
+        results = run_many(self.target, [
+            "cat /proc/%s/stat" % pid,
+            "cat /proc/uptime",
+            "grep -E '^Vm(RSS|HWM):' /proc/%s/status" % pid,
+            "getconf CLK_TCK"])
+        fields = results[0][1].rsplit(")", 1)[-1].split()
+        # utime and stime are fields 14 and 15 of stat
+        ticks = int(fields[11]) + int(fields[12])
+        uptime = float(results[1][1].split()[0])
+        memory = dict(line.split()[:2] for line in results[2][1].splitlines())
+        clk_tck = int(results[3][1]) if results[3][0] == 0 else 100
+        return (ticks / float(clk_tck), uptime,
+                int(memory.get("VmRSS:", 0)), int(memory.get("VmHWM:", 0)))
+
+    def _run_load(self, client, concurrency, duration):
+        """Request the endpoints round robin from concurrency threads
+        for duration seconds
+        @fn _run_load
+        @param self
+        @param client
+        @param concurrency
+        @param duration
+        @return list of (endpoint, latency, ok)
+        """
+        samples = []
+        lock = threading.Lock()
+        deadline = time.time() + duration
+        def worker(offset):
+            mine = []
+            index = offset
+            while time.time() < deadline:
+                endpoint = self.endpoints[index % len(self.endpoints)]
+                index += 1
+                start = time.time()
+                try:
+                    response = client.get(endpoint)
+                    mine.append((endpoint, response.latency,
+                                 200 <= response.status < 300))
+                except (httplib.HTTPException, socket.error):
+                    mine.append((endpoint, time.time() - start, False))
+            client._drop_connection()
+            with lock:
+                samples.extend(mine)
+        threads = [threading.Thread(target=worker, args=(i,))
+                   for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples
+
+    def setUp(self):
+        """Start the REST API server unless it is running
+        @fn setUp
+        @param self
+        @return
+        """
+        self.started = False
+        self.client = RestClient(self.target.ip)
+        if not self._server_pid():
+            self.target.run("cd %s; node index.js > %s 2>&1 &" %
+                            (self.rest_api_home, self.rest_api_log))
+            self.started = True
+        self.assertIsNotNone(self.client.wait_until_ready(timeout=20),
+                             "REST API server is not answering")
+
+    def tearDown(self):
+        """Stop the server if this test started it
+        @fn tearDown
+        @param self
+        @return
+        """
+        self.client.close()
+        pid = self._server_pid()
+        if self.started and pid:
+            self.target.run("kill %s" % pid)
+
+    def test_restapi_load(self):
+        """Measure latency percentiles, throughput and server usage
+        @fn test_restapi_load
+        @param self
+        @return
+        """
+        filename = os.path.basename(__file__)
+        casename = os.path.splitext(filename)[0]
+        concurrency = self._get_setting("REST_LOAD_CONCURRENCY",
+                                        self.concurrency)
+        duration = self._get_setting("REST_LOAD_DURATION", self.duration)
+
+        # warm up, the first requests of each endpoint load its modules
+        for endpoint in self.endpoints:
+            self.client.get(endpoint)
+
+        pid = self._server_pid()
+        (cpu_start, uptime_start, rss, hwm) = self._server_usage(pid)
+        start = time.time()
+        samples = self._run_load(self.client, concurrency, duration)
+        elapsed = time.time() - start
+        (cpu_end, uptime_end, rss, hwm) = self._server_usage(pid)
+
+        latencies = sorted(s[1] * 1000 for s in samples if s[2])
+        failed = len([s for s in samples if not s[2]])
+        cpu = 100 * (cpu_end - cpu_start) / (uptime_end - uptime_start)
+        result = "p50=%.1fms p95=%.1fms p99=%.1fms rps=%.1f " \
+                 "rss=%dKB peak_rss=%dKB cpu=%.1f%% concurrency=%d" % (
+                 percentile(latencies, 50), percentile(latencies, 95),
+                 percentile(latencies, 99), len(latencies) / elapsed,
+                 rss, hwm, cpu, concurrency)
+        collect_pnp_log(casename, casename, result)
+        tags = {"concurrency": concurrency}
+        for pct in [50, 95, 99]:
+            record_metric(casename, percentile(latencies, pct), "ms",
+                          dict(tags, percentile=pct))
+        record_metric(casename, len(latencies) / elapsed, "req/s", tags)
+        record_metric(casename, cpu, "%", dict(tags, resource="cpu"))
+        record_metric(casename, rss, "KB", dict(tags, resource="rss"))
+        record_metric(casename, hwm, "KB", dict(tags, resource="peak_rss"))
+        print "\n%s:%s\n" % (casename, result)
+
+        detail = []
+        for endpoint in self.endpoints:
+            values = sorted(s[1] * 1000 for s in samples
+                            if s[0] == endpoint and s[2])
+            detail.append("%s: requests=%d failed=%d p50=%.1fms "
+                          "p95=%.1fms p99=%.1fms" % (endpoint,
+                          len([s for s in samples if s[0] == endpoint]),
+                          len([s for s in samples
+                               if s[0] == endpoint and not s[2]]),
+                          percentile(values, 50), percentile(values, 95),
+                          percentile(values, 99)))
+        collect_pnp_log(casename, casename + "-detail", "\n".join(detail))
+        ##
+        # TESTPOINT: #1, test_restapi_load
+        #
+        self.assertTrue(latencies, "No request succeeded")
+        ##
+        # TESTPOINT: #2, test_restapi_load
+        #
+        self.assertEqual(failed, 0,
+                         "%d of %d requests failed" % (failed, len(samples)))
+
+##
+# @}
+# @}
+##
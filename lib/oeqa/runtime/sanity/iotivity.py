@@ -16,6 +16,8 @@ import time
 import string
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.helper import shell_cmd_timeout
+from oeqa.utils.helper import run_many
+from oeqa.utils.helper import wait_for_output
 from oeqa.utils.decorators import tag
 
 @tag(TestType="FVT", FeatureID="IOTOS-498,IOTOS-450")
@@ -30,8 +32,7 @@ class IOtvtClient(oeRuntimeTest):
         @param cls
         @return
         '''
-        cls.tc.target.run("killall simpleserver")
-        cls.tc.target.run("killall simpleclient")
+        run_many(cls.tc.target, ["killall simpleserver", "killall simpleclient"])
         # start server
         server_cmd = "/opt/iotivity/examples/resource/cpp/simpleserver > /tmp/svr_output &"
         (status, output) = cls.tc.target.run(server_cmd)
@@ -39,19 +40,19 @@ class IOtvtClient(oeRuntimeTest):
         # start client to get info
         client_cmd = "/opt/iotivity/examples/resource/cpp/simpleclient > /tmp/output &"
         cls.tc.target.run(client_cmd)
-        print "\npatient... simpleclient needs long time for its observation"
-        time.sleep(60)
+        print "\npatient... simpleclient needs up to 60s for its observation"
+        markers = ["DISCOVERED Resource", "GET request was successful",
+                   "PUT request was successful", "Observe is used."]
+        (found, output) = wait_for_output(cls.tc.target, "/tmp/output",
+                                          markers, 60)
         # If there is no 'Observe is used', give a retry.
-        (status, output) = cls.tc.target.run('cat /tmp/output')
-        if "Observe is used." in output:
-            pass
-        else:
-            cls.tc.target.run("killall simpleserver")
-            cls.tc.target.run("killall simpleclient")
+        if not found:
+            run_many(cls.tc.target, ["killall simpleserver",
+                                     "killall simpleclient"])
             time.sleep(2)
             (status, output) = cls.tc.target.run(server_cmd)
             cls.tc.target.run(client_cmd)
-            time.sleep(60)
+            wait_for_output(cls.tc.target, "/tmp/output", markers, 60)
         # Retry ends.
 
     @classmethod
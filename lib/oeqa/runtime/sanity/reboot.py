@@ -11,9 +11,9 @@
 # @{
 ##
 
-import time
 from oeqa.oetest import oeRuntimeTest
-from oeqa.utils.helper import shell_cmd_timeout
+from oeqa.utils.rebootengine import RebootEngine, RebootError
+from oeqa.utils.rebootengine import format_summary
 
 class RebootTest(oeRuntimeTest):
     '''Reboot target device
@@ -38,52 +38,32 @@ class RebootTest(oeRuntimeTest):
         (ret, output) = self.target.run('/bin/true', 10)
         return True if ret == 0 else False
 
-    def _wait_offline(self):
-        '''wait till device offline
-        @fn _wait_offline
-        @param self
-        @return
-        '''
-        for _ in range(60):
-            if not self._alive():
-                return True
-            time.sleep(1)
-        return False
-
-    def _wait_online(self):
-        '''wait till device online
-        @fn _wait_online
-        @param self
-        @return
-        '''
-        for _ in range(60):
-            if self._alive():
-                return True
-            time.sleep(1)
-        return False
-
     def test_reboot(self):
-        '''reboot target device
+        '''reboot target device, REBOOT_CYCLES times (default 1)
         @fn test_reboot
         @param self
         @return
         '''
-        for cnt in range(1):
+        cycles = int(oeRuntimeTest.tc.d.getVar("REBOOT_CYCLES", True) or 1)
+        engine = RebootEngine(self.target)
+        results = []
+        for cnt in range(cycles):
             print "Reboot %d time" % cnt
-            ret = self.target.run('reboot &', 5)[0]
-#            self.assertEqual(ret, 0, msg="Fail to trigger reboot command")
-            time.sleep(4)
-            status = self._wait_offline()
+            try:
+                results.append(engine.reboot())
+                error = None
+            except RebootError as e:
+                error = str(e)
             ##
             # TESTPOINT: #1, test_reboot
             #
-            self.assertTrue(status, msg="Fail to drive system off")
-            time.sleep(4)
-            status = self._wait_online()
+            self.assertIsNone(error, msg="Fail to reboot system: %s" % error)
+            print results[-1]
             ##
             # TESTPOINT: #2, test_reboot
             #
-            self.assertTrue(status, msg="Fail to bring up system")
+            self.assertTrue(self._alive(), msg="Fail to bring up system")
+        print format_summary(results)
 
 ##
 # @}
@@ -7,6 +7,7 @@ import os
 from oeqa.oetest import oeRuntimeTest
 from oeqa.utils.decorators import *
 from oeqa.utils.helper import get_files_dir
+from oeqa.utils.helper import run_many
 
 
 @tag(TestType = 'FVT', FeatureID = 'IOTOS-1228')
@@ -16,13 +17,11 @@ class DacTestConfig(oeRuntimeTest):
     """
 
 
-    def _add_user(self, user, group):
+    def _add_user_cmd(self, user, group):
         """
-        checks if user exists, and adds it if not
+        command that checks if user exists, and adds it if not
         """
-        status, output = self.target.run("id -u %s" %user)
-        if status != 0:
-            self.target.run("useradd -M %s -g %s" %(user, group))
+        return "id -u %s || useradd -M %s -g %s" %(user, user, group)
 
     def setUp(self):
         self.user1 = "dac1"
@@ -31,23 +30,20 @@ class DacTestConfig(oeRuntimeTest):
 
         self.groupA = "groupA"
         self.groupB = "groupB"
-        status, output = self.target.run("addgroup %s" %self.groupA)
-        status, output = self.target.run("addgroup %s" %self.groupB)
-        self._add_user(self.user1, self.groupA)
-        self._add_user(self.user2, self.groupA)
-        self._add_user(self.user3, self.groupB)
-
-        self.target.run("touch /tmp/file{1,2,3}")
-        self.target.run("chown %s:%s /tmp/file{1,2,3}" %(self.user1, self.groupA))
-        self.target.run("chmod 700 /tmp/file1")
-        self.target.run("chmod 770 /tmp/file2")
-        self.target.run("chmod 777 /tmp/file3")
-
-        # if smack is enabled, make sure it does not block access
-        # "Any access on label star(*) is permitted"
-        status, output = self.target.run("mount | grep smackfs ")
-        if status == 0:
-            self.target.run("chsmack -a '*' /tmp/file{1,2,3}")
+        run_many(self.target, [
+            "addgroup %s" %self.groupA,
+            "addgroup %s" %self.groupB,
+            self._add_user_cmd(self.user1, self.groupA),
+            self._add_user_cmd(self.user2, self.groupA),
+            self._add_user_cmd(self.user3, self.groupB),
+            "touch /tmp/file{1,2,3}",
+            "chown %s:%s /tmp/file{1,2,3}" %(self.user1, self.groupA),
+            "chmod 700 /tmp/file1",
+            "chmod 770 /tmp/file2",
+            "chmod 777 /tmp/file3",
+            # if smack is enabled, make sure it does not block access
+            # "Any access on label star(*) is permitted"
+            "if mount | grep smackfs; then chsmack -a '*' /tmp/file{1,2,3}; fi"])
 
     def test_same_group_no_access(self):
 
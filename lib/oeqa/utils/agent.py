@@ -0,0 +1,139 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Host side of the on-target test agent (files/iotqa_agent.py)"""
+
+import os
+import json
+import time
+import select
+import threading
+import subprocess
+
+AGENT_FILE = os.path.join(os.path.dirname(__file__), "files", "iotqa_agent.py")
+
+class AgentError(Exception):
+    """The agent is not reachable or the request failed on the target"""
+    pass
+
+class TargetAgent(object):
+    """Persistent JSON-RPC channel to the test agent on the target.
+    The agent is copied to the target and started over ssh on first use,
+    then every request reuses the same ssh channel, avoiding a process
+    spawn and shell startup per check on the device."""
+
+    remote_path = "/tmp/iotqa_agent.py"
+
+    def __init__(self, target, timeout=300):
+        self.target = target
+        self.timeout = timeout
+        self.proc = None
+        self.request_id = 0
+        self.buf = ""
+        self.lock = threading.Lock()
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        """Deploy the agent and open the channel"""
+        self.stop()
+        try:
+            self.target.copy_to(AGENT_FILE, self.remote_path)
+        except AssertionError as e:
+            raise AgentError("Fail to copy agent to target: %s" % e)
+        command = self.target.connection.ssh + \
+                  [self.target.ip, "python %s" % self.remote_path]
+        with open(os.devnull, "w") as devnull:
+            self.proc = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE,
+                                         stderr=devnull)
+        self.buf = ""
+        self._call("ping", 30, {})
+
+    def stop(self, kill=False):
+        """Close the channel, the agent exits on end of input.
+        kill drops the ssh channel at once instead, for an agent which
+        does not answer: it only reads the end of input once its current
+        request returned."""
+        if self.alive():
+            try:
+                if kill:
+                    self.proc.kill()
+                else:
+                    self.proc.stdin.close()
+                self.proc.wait()
+            except (IOError, OSError):
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+    def _readline(self, deadline):
+        fd = self.proc.stdout.fileno()
+        while "\n" not in self.buf:
+            wait = deadline - time.time()
+            if wait <= 0 or not select.select([fd], [], [], wait)[0]:
+                self.stop(kill=True)
+                raise AgentError("Timeout waiting for agent response")
+            data = os.read(fd, 65536)
+            if not data:
+                self.stop(kill=True)
+                raise AgentError("Agent connection closed")
+            self.buf += data
+        (line, self.buf) = self.buf.split("\n", 1)
+        return line
+
+    def _call(self, method, timeout, params):
+        self.request_id += 1
+        request = {"jsonrpc": "2.0", "id": self.request_id,
+                   "method": method, "params": params}
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        except (IOError, OSError) as e:
+            self.stop(kill=True)
+            raise AgentError("Agent connection lost: %s" % e)
+        deadline = time.time() + (timeout or self.timeout)
+        while True:
+            response = json.loads(self._readline(deadline))
+            if response.get("id") == self.request_id:
+                break
+        if "error" in response:
+            raise AgentError(response["error"]["message"])
+        return response["result"]
+
+    def call(self, method, params=None, timeout=None):
+        """Send one request, (re)starting the agent if needed,
+        e.g. after the target rebooted"""
+        with self.lock:
+            if not self.alive():
+                self.start()
+            return self._call(method, timeout, params or {})
+
+    def run(self, cmd, timeout=None):
+        """@return (status, output) like target.run"""
+        result = self.call("run", {"cmd": cmd, "timeout": timeout},
+                           timeout + 10 if timeout else None)
+        return (result["status"], result["output"].rstrip())
+
+    def read_file(self, path):
+        return self.call("read_file", {"path": path})["data"]
+
+    def write_file(self, path, data, append=False):
+        return self.call("write_file",
+                         {"path": path, "data": data, "append": append})
+
+    def stat(self, path):
+        return self.call("stat", {"path": path})
+
+    def wait_for_pattern(self, path, patterns, timeout=60, interval=0.2):
+        """@return dict with found, missing, data and elapsed"""
+        return self.call("wait_for_pattern",
+                         {"path": path, "patterns": patterns,
+                          "timeout": timeout, "interval": interval},
+                         timeout + 30)
+
+    def spawn_background(self, cmd, output=None):
+        """@return pid of the started process"""
+        return self.call("spawn_background",
+                         {"cmd": cmd, "output": output})["pid"]
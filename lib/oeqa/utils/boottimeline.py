@@ -0,0 +1,97 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Per unit boot timeline from systemd and the journal.
+
+Unit activation times come from `systemctl show`, which has the
+monotonic timestamps and the After= ordering of every unit. The
+critical path is computed from them the way `systemd-analyze
+critical-chain` does: starting at the default target, follow the After=
+dependency that became active last before the unit started.
+"""
+
+import re
+
+# properties read for every unit
+UNIT_PROPERTIES = ["Id", "After", "InactiveExitTimestampMonotonic",
+                   "ActiveEnterTimestampMonotonic"]
+SPAN_UNITS = {"ms": 0.001, "s": 1.0, "min": 60.0, "h": 3600.0, "us": 1e-6}
+
+def parse_timespan(text):
+    """Seconds of a systemd time span like '1min 2.345s' or '345ms'"""
+    seconds = 0.0
+    for (value, unit) in re.findall(r"(\d+(?:\.\d+)?)(ms|us|min|h|s)\b",
+                                    text):
+        seconds += float(value) * SPAN_UNITS[unit]
+    return seconds
+
+def parse_blame(output):
+    """@return {unit: activation seconds} of `systemd-analyze blame`"""
+    blame = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and "." in fields[-1]:
+            blame[fields[-1]] = parse_timespan(" ".join(fields[:-1]))
+    return blame
+
+def parse_unit_times(output):
+    """Parse `systemctl show -p Id -p After -p ...` of several units,
+    blocks separated by empty lines
+    @return {unit: (start, end, after)} in seconds since boot, units that
+            never became active are left out
+    """
+    units = {}
+    for block in output.split("\n\n"):
+        props = dict(line.split("=", 1) for line in block.splitlines()
+                     if "=" in line)
+        start = int(props.get("InactiveExitTimestampMonotonic") or 0)
+        end = int(props.get("ActiveEnterTimestampMonotonic") or 0)
+        if props.get("Id") and end:
+            units[props["Id"]] = (start / 1e6 if start else end / 1e6,
+                                  end / 1e6,
+                                  props.get("After", "").split())
+    return units
+
+def parse_journal(output):
+    """Unit start and stop messages of systemd in a
+    `journalctl -o short-monotonic` output
+    @return list of (seconds since boot, message)
+    """
+    events = []
+    pattern = re.compile(r"^\[\s*(\d+\.\d+)\]\s+\S+\s+systemd\[1\]:\s+"
+                         r"((?:Starting|Started|Reached target|Failed)"
+                         r"\b.*)$")
+    for line in output.splitlines():
+        match = pattern.match(line)
+        if match:
+            events.append((float(match.group(1)), match.group(2)))
+    return events
+
+def critical_path(units, target):
+    """Chain of units that delayed target, from the first to target
+    @return list of (unit, activated at, time it took)
+    """
+    path = []
+    unit = target
+    seen = set()
+    while unit in units and unit not in seen:
+        seen.add(unit)
+        (start, end, after) = units[unit]
+        path.append((unit, end, end - start))
+        # the dependency that became active last, before unit started
+        ready = [(units[dep][1], dep) for dep in after
+                 if dep in units and units[dep][1] <= start]
+        if not ready:
+            break
+        unit = max(ready)[1]
+    path.reverse()
+    return path
+
+def format_timeline(units):
+    """One line per unit, ordered by start time"""
+    lines = []
+    for (unit, (start, end, after)) in sorted(units.items(),
+                                              key=lambda x: x[1][0]):
+        lines.append("%9.3fs %9.3fs %8.3fs %s" % (start, end, end - start,
+                                                   unit))
+    return "\n".join(lines)
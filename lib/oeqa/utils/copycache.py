@@ -0,0 +1,128 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Content addressed cache for files uploaded to the target"""
+
+import os
+import re
+import hashlib
+
+CACHE_DIR = "/var/cache/iotqa"
+# the least recently used files are evicted above this size, in kB
+MAX_SIZE = 64 * 1024
+# returned by the install command when the cached copy disappeared
+MISSING = 100
+
+def _quote(path):
+    return "'%s'" % path.replace("'", "'\\''")
+
+class CopyCache(object):
+    """Keep every uploaded file on the target under its sha1 and copy
+    it to the requested path on the device, so the same binary or
+    archive is only transferred once, however many tests copy it.
+    The cache is bound to the image: a stamp of /etc/version and
+    /etc/os-release is kept next to the files, and the cache is wiped
+    when the stamp changes, e.g. after the device was reflashed.
+    The cache is bounded to max_size kB, the files used least recently
+    are removed first."""
+
+    def __init__(self, target, cache_dir=CACHE_DIR, max_size=MAX_SIZE):
+        self.target = target
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.enabled = True
+        self.present = None
+        self.hashes = {}
+
+    def _digest(self, localpath):
+        """sha1 of a local file, memorized while the file is unchanged"""
+        st = os.stat(localpath)
+        key = (os.path.abspath(localpath), st.st_size, st.st_mtime)
+        if key not in self.hashes:
+            sha = hashlib.sha1()
+            with open(localpath, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    sha.update(block)
+            self.hashes[key] = sha.hexdigest()
+        return self.hashes[key]
+
+    def _load(self):
+        """Validate the cache against the image and list its content"""
+        cmd = "c=%s; s=$(cat /etc/version /etc/os-release 2>/dev/null | " \
+              "md5sum | cut -d' ' -f1); mkdir -p $c || exit 1; " \
+              "[ \"$(cat $c/.image 2>/dev/null)\" = \"$s\" ] || " \
+              "{ rm -rf $c/*; echo $s > $c/.image; }; ls $c" % self.cache_dir
+        (status, output) = self.target.connection.run(cmd)
+        if status != 0:
+            print "Upload cache disabled, %s not usable: %s" % \
+                  (self.cache_dir, output)
+            self.enabled = False
+            return
+        self.present = set(name for name in output.split()
+                           if re.match("^[0-9a-f]{40}$", name))
+
+    def _install(self, digest, localpath, remotepath):
+        cached = os.path.join(self.cache_dir, digest)
+        # a copy rather than a hard link, so a test writing to its file
+        # cannot corrupt the cached one; the mtime of the cached file is
+        # its last use, for the eviction
+        cmd = "d=%s; [ -d \"$d\" ] && d=\"$d\"/%s; [ -f %s ] || exit %d; " \
+              "touch -c %s; " \
+              "cmp -s %s \"$d\" 2>/dev/null || cp %s \"$d\" 2>/dev/null || " \
+              "{ rm -f \"$d\"; cp %s \"$d\"; }" % \
+              (_quote(remotepath), _quote(os.path.basename(localpath)),
+               cached, MISSING, cached, cached, cached, cached)
+        return self.target.connection.run(cmd)
+
+    def _upload(self, digest, localpath):
+        cached = os.path.join(self.cache_dir, digest)
+        self.target.connection.copy_to(localpath, cached + ".part")
+        (status, output) = self.target.connection.run(
+                "mv %s.part %s" % (cached, cached))
+        if status == 0:
+            self.present.add(digest)
+            self._evict(digest)
+        return status == 0
+
+    def _evict(self, keep):
+        """Remove the least recently used files above max_size kB,
+        except keep"""
+        cmd = "cd %s || exit 1; total=0; for f in $(ls -t | " \
+              "grep -E '^[0-9a-f]{40}$'); do " \
+              "total=$((total + $(du -k $f | cut -f1))); " \
+              "[ $total -gt %d ] && [ $f != %s ] && rm -f $f && echo $f; " \
+              "done; true" % (self.cache_dir, self.max_size, keep)
+        (status, output) = self.target.connection.run(cmd)
+        for digest in output.split():
+            self.present.discard(digest)
+
+    def copy_to(self, localpath, remotepath):
+        """Same contract as SSHControl.copy_to, (status, output) on
+        success and AssertionError on failure"""
+        if not self.enabled or not os.path.isfile(localpath):
+            return self.target.connection.copy_to(localpath, remotepath)
+        if self.present is None:
+            self._load()
+            if not self.enabled:
+                return self.target.connection.copy_to(localpath, remotepath)
+        digest = self._digest(localpath)
+        if digest not in self.present and \
+           not self._upload(digest, localpath):
+            return self.target.connection.copy_to(localpath, remotepath)
+        (status, output) = self._install(digest, localpath, remotepath)
+        if status == MISSING:
+            # removed behind our back, transfer it again
+            self.present.discard(digest)
+            self._upload(digest, localpath)
+            (status, output) = self._install(digest, localpath, remotepath)
+        if status != 0:
+            raise AssertionError("Command '%s' returned non-zero exit "
+                                 "status %d:\n%s" % ("copy_to %s %s" %
+                                 (localpath, remotepath), status, output))
+        return (status, output)
+
+    def clear(self):
+        """Remove every cached file from the target"""
+        self.target.connection.run("rm -rf %s" % self.cache_dir)
+        self.present = None
+        self.enabled = True
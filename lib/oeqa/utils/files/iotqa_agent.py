@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Test agent running on the target device.
+
+Reads one JSON-RPC 2.0 request per line from stdin and writes one
+response per line to stdout, so the host can drive it over a single ssh
+channel. Only depends on the python standard library.
+"""
+
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import time
+
+background = []
+
+def _text(data):
+    if isinstance(data, bytes):
+        return data.decode("utf-8", "replace")
+    return data
+
+def _reap():
+    """Collect finished background processes"""
+    for proc in background[:]:
+        if proc.poll() is not None:
+            background.remove(proc)
+
+def run(cmd, timeout=None):
+    """Run a shell command, kill its process group on timeout"""
+    proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, preexec_fn=os.setsid)
+    deadline = time.time() + timeout if timeout else None
+    output = []
+    fd = proc.stdout.fileno()
+    while True:
+        wait = max(deadline - time.time(), 0) if deadline else None
+        ready = select.select([fd], [], [], wait)[0]
+        if not ready:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+            return {"status": -99999, "output": _text(b"".join(output))}
+        data = os.read(fd, 65536)
+        if not data:
+            break
+        output.append(data)
+    return {"status": proc.wait(), "output": _text(b"".join(output))}
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return {"data": _text(f.read())}
+
+def write_file(path, data, append=False):
+    with open(path, "ab" if append else "wb") as f:
+        f.write(data.encode("utf-8"))
+    return {"size": os.path.getsize(path)}
+
+def stat(path):
+    if not os.path.exists(path):
+        return {"exists": False}
+    st = os.stat(path)
+    return {"exists": True, "size": st.st_size, "mode": st.st_mode,
+            "mtime": st.st_mtime, "isdir": os.path.isdir(path)}
+
+def wait_for_pattern(path, patterns, timeout=60, interval=0.2):
+    """Wait until every pattern shows up in the file at path, a pattern
+    listed n times has to show up at least n times"""
+    start = time.time()
+    while True:
+        data = ""
+        if os.path.exists(path):
+            data = read_file(path)["data"]
+        missing = [p for p in sorted(set(patterns))
+                   if data.count(p) < patterns.count(p)]
+        elapsed = time.time() - start
+        if not missing or elapsed >= timeout:
+            return {"found": not missing, "missing": missing, "data": data,
+                    "elapsed": elapsed}
+        time.sleep(interval)
+
+def spawn_background(cmd, output=None):
+    """Start a shell command detached from the agent"""
+    out = open(output or os.devnull, "w")
+    proc = subprocess.Popen(cmd, shell=True, stdout=out,
+                            stderr=subprocess.STDOUT, preexec_fn=os.setsid)
+    out.close()
+    background.append(proc)
+    return {"pid": proc.pid}
+
+def ping():
+    return {"pid": os.getpid()}
+
+METHODS = {
+    "run": run,
+    "read_file": read_file,
+    "write_file": write_file,
+    "stat": stat,
+    "wait_for_pattern": wait_for_pattern,
+    "spawn_background": spawn_background,
+    "ping": ping,
+}
+
+def handle(line):
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        method = METHODS[request["method"]]
+        result = method(**request.get("params", {}))
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+    except Exception as e:
+        return {"jsonrpc": "2.0", "id": request_id,
+                "error": {"code": -32000, "message": "%s: %s" %
+                          (e.__class__.__name__, e)}}
+
+def main():
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        response = handle(line)
+        _reap()
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
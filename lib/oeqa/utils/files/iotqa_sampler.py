@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""System sampler running on the target device.
+
+Reads /proc/stat and /proc/meminfo at a fixed rate and writes one fixed
+size record per sample into a binary ring buffer file, so a long window
+costs a bounded amount of storage and no shell or process spawn per
+sample. The stat, status and smaps_rollup (smaps on kernels without it)
+files of the given processes are read every PROC_EVERY-th sample, with
+PROC_EVERY 0 only once in an extra record after sampling ended, so that
+reading them does not load the sampled window.
+Sampling ends after DURATION seconds or once OUTPUT.stop exists.
+With --settle, it also ends MEASURE seconds after the system settled,
+that is once the last STABLE seconds had a steady CPU load and
+MemAvailable (see find_settle_point in sampler.py), and prints
+"settled SECONDS 1" when it did, "settled SECONDS 0" when the settle
+time ran out, SECONDS being the start of the measured part.
+The sampler prints its own load last, "sampler CPU RSS" with CPU the
+percentage of all CPUs it used while sampling and RSS its peak in kB.
+Only depends on the python standard library.
+
+usage: iotqa_sampler.py [--settle=STABLE,CPU_TOLERANCE,MEM_TOLERANCE,MEASURE]
+                        OUTPUT DURATION INTERVAL CAPACITY PROC_EVERY [PID...]
+"""
+
+import os
+import sys
+import time
+import struct
+
+MAGIC = b"IQS1"
+# magic, version, interval, capacity, process count, process every
+# n-th sample, samples written so far (last, updated after each record)
+HEADER = struct.Struct("<4sIdIIIQ")
+COUNT_OFFSET = HEADER.size - 8
+# pid and comm of each sampled process, after the header
+PROCESS = struct.Struct("<I16s")
+CPU_FIELDS = 8
+MEM_KEYS = ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached",
+            "SwapTotal", "SwapFree"]
+# uptime, cpu jiffies, meminfo kB, whether the processes were sampled
+SYSTEM = struct.Struct("<d%dQ%dQB" % (CPU_FIELDS, len(MEM_KEYS)))
+# values of that flag: no, yes, and only them, the system values of the
+# record taken after sampling ended are not part of the window
+PROCS_NONE, PROCS_SAMPLED, PROCS_ONLY = 0, 1, 2
+# cpu ticks, rss, pss and uss in kB
+PROC_SAMPLE = struct.Struct("<4Q")
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("ascii", "replace")
+    except (IOError, OSError):
+        return ""
+
+def _kb_fields(data, keys):
+    values = dict.fromkeys(keys, 0)
+    for line in data.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0].rstrip(":") in values:
+            values[fields[0].rstrip(":")] = int(fields[1])
+    return [values[k] for k in keys]
+
+def _kb_sums(data, keys):
+    """Like _kb_fields, summing every occurrence, e.g. over the
+    mappings of a smaps file"""
+    values = dict.fromkeys(keys, 0)
+    for line in data.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0].rstrip(":") in values:
+            values[fields[0].rstrip(":")] += int(fields[1])
+    return [values[k] for k in keys]
+
+def sample_system():
+    uptime = float(_read("/proc/uptime").split()[0])
+    cpu = [int(x) for x in _read("/proc/stat").splitlines()[0].split()[1:]]
+    cpu = (cpu + [0] * CPU_FIELDS)[:CPU_FIELDS]
+    return [uptime] + cpu + _kb_fields(_read("/proc/meminfo"), MEM_KEYS)
+
+def sample_process(pid):
+    stat = _read("/proc/%d/stat" % pid)
+    if not stat:
+        # exited
+        return [0, 0, 0, 0]
+    fields = stat.rsplit(")", 1)[-1].split()
+    ticks = int(fields[11]) + int(fields[12])
+    rss = _kb_fields(_read("/proc/%d/status" % pid), ["VmRSS"])[0]
+    smaps = _read("/proc/%d/smaps_rollup" % pid) or \
+            _read("/proc/%d/smaps" % pid)
+    (pss, clean, dirty) = _kb_sums(smaps,
+                                   ["Pss", "Private_Clean", "Private_Dirty"])
+    return [ticks, rss, pss, clean + dirty]
+
+class SettleDetector(object):
+    """find_settle_point of sampler.py, evaluated as the samples come
+    so that nobody has to fetch them during the window"""
+
+    def __init__(self, stable, cpu_tolerance, mem_tolerance):
+        self.stable = stable
+        self.cpu_tolerance = cpu_tolerance
+        self.mem_tolerance = mem_tolerance
+        self.start = None
+        # (uptime, cpu jiffies, MemAvailable) and (uptime, busy percent)
+        # of the last stable seconds
+        self.samples = []
+        self.usage = []
+
+    def add(self, values):
+        """@param values a sample_system() list
+        @return seconds since the first sample the system settled at,
+                None if it did not settle yet
+        """
+        uptime = values[0]
+        cpu = values[1:1 + CPU_FIELDS]
+        mem = dict(zip(MEM_KEYS, values[1 + CPU_FIELDS:]))
+        if self.start is None:
+            self.start = uptime
+        if self.samples:
+            delta = [b - a for (a, b) in zip(self.samples[-1][1], cpu)]
+            total = sum(delta)
+            if total > 0:
+                # idle and iowait are not busy
+                self.usage.append((uptime, 100.0 *
+                                   (total - delta[3] - delta[4]) / total))
+        self.samples.append((uptime, cpu, mem["MemAvailable"]))
+        horizon = uptime - self.stable
+        self.samples = [x for x in self.samples if x[0] >= horizon]
+        self.usage = [x for x in self.usage if x[0] > horizon]
+        if uptime - self.start < self.stable or not self.usage or \
+           self.usage[-1][0] != uptime:
+            return None
+        window = [u for (t, u) in self.usage]
+        half = len(window) // 2
+        if half < 1:
+            return None
+        cpu_drift = abs(sum(window[:half]) / half -
+                        sum(window[half:]) / (len(window) - half))
+        available = [a for (t, c, a) in self.samples]
+        mem_drift = 100.0 * (max(available) - min(available)) / \
+                    (mem["MemTotal"] or 1)
+        if cpu_drift <= self.cpu_tolerance and \
+           mem_drift <= self.mem_tolerance:
+            return uptime - self.start
+        return None
+
+def comm(pid):
+    return _read("/proc/%d/comm" % pid).strip().encode("ascii", "replace")
+
+def own_usage(start, wall):
+    """CPU percentage of all CPUs since start, wall seconds ago, and
+    peak RSS in kB of this process"""
+    times = os.times()
+    cpus = os.sysconf("SC_NPROCESSORS_ONLN") or 1
+    busy = times[0] + times[1] - start
+    percent = 100.0 * busy / (wall * cpus) if wall > 0 else 0.0
+    hwm = _kb_fields(_read("/proc/self/status"), ["VmHWM"])[0]
+    return (percent, hwm)
+
+def main(argv):
+    argv = list(argv)
+    detector = None
+    if len(argv) > 1 and argv[1].startswith("--settle="):
+        settle = [float(x) for x in argv.pop(1).split("=", 1)[1].split(",")]
+        detector = SettleDetector(*settle[:3])
+        measure = settle[3]
+    (output, duration, interval, capacity, proc_every) = argv[1:6]
+    duration, interval = float(duration), float(interval)
+    capacity, proc_every = int(capacity), max(int(proc_every), 0)
+    pids = [int(pid) for pid in argv[6:]]
+    settled_at = None
+    settled = False
+    slot = SYSTEM.size + PROC_SAMPLE.size * len(pids)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 1, interval, capacity, len(pids),
+                            proc_every, 0))
+        for pid in pids:
+            f.write(PROCESS.pack(pid, comm(pid)))
+    data_offset = HEADER.size + PROCESS.size * len(pids)
+    f = open(output, "r+b")
+    cpu_start = sum(os.times()[:2])
+    start = time.time()
+    count = 0
+
+    def write_record(procs):
+        system = sample_system()
+        record = SYSTEM.pack(*(system + [procs]))
+        for pid in pids:
+            values = sample_process(pid) if procs else [0, 0, 0, 0]
+            record += PROC_SAMPLE.pack(*values)
+        f.seek(data_offset + (count % capacity) * slot)
+        f.write(record)
+        f.seek(COUNT_OFFSET)
+        f.write(struct.pack("<Q", count + 1))
+        f.flush()
+        return system
+
+    while True:
+        system = write_record(PROCS_SAMPLED if proc_every and
+                              count % proc_every == 0 else PROCS_NONE)
+        count += 1
+        if count * interval > duration or os.path.exists(output + ".stop"):
+            break
+        if detector is not None:
+            if settled_at is None:
+                settled_at = detector.add(system)
+                settled = settled_at is not None
+                elapsed = system[0] - detector.start
+                if not settled and elapsed >= duration - measure:
+                    # bounded by the former fixed wait
+                    settled_at = duration - measure
+            if settled_at is not None and \
+               system[0] - detector.start >= settled_at + measure:
+                break
+        # fixed rate, independent of the time spent sampling
+        wait = start + count * interval - time.time()
+        if wait > 0:
+            time.sleep(wait)
+    usage = own_usage(cpu_start, time.time() - start)
+    if pids and not proc_every:
+        write_record(PROCS_ONLY)
+        count += 1
+    f.close()
+    if detector is not None:
+        if settled_at is None:
+            settled_at = max(duration - measure, 0)
+        sys.stdout.write("settled %.3f %d\n" % (settled_at, settled))
+    sys.stdout.write("sampler %.3f %d\n" % usage)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -2,10 +2,19 @@
 #\License: ALL RIGHTS RESERVED
 #\Author: Wang, Jing <jing.j.wang@intel.com>
 
+import os
+import sys
 import time
+import uuid
+import pipes
+import Queue
+import select
+import signal
+import threading
 import subprocess
-import os
 from oeqa.oetest import oeRuntimeTest
+from oeqa.utils.agent import AgentError
+from oeqa.utils.rebootengine import RebootEngine, RebootError
 import unittest
 
 def shell_cmd(cmd):
@@ -13,29 +22,218 @@ def shell_cmd(cmd):
     cmd_proc = subprocess.Popen(cmd, shell=True)
     return cmd_proc.wait() if cmd_proc else -1
 
-def shell_cmd_timeout(cmd, timeout=0):
+def shell_cmd_stream(cmd, timeout=0, callback=None, logfile=None):
+    """Execute shell command till it exits or timeout seconds passed.
+    The command runs in its own process group, which is killed as a
+    whole on timeout. Output is handed over as it arrives: every chunk
+    goes to callback(name, data), name being "stdout" or "stderr", and is
+    appended to logfile; stderr is also passed through to our stderr.
+    @param timeout seconds, 0 means no timeout
+    @return (ret, stdout output, elapsed seconds), ret is -99999 on timeout
+    """
+    start = time.time()
+    cmd_proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, preexec_fn=os.setsid)
+    log = open(logfile, "a") if logfile else None
+    streams = {cmd_proc.stdout.fileno(): "stdout",
+               cmd_proc.stderr.fileno(): "stderr"}
+    output = []
+    ret = None
+    try:
+        while streams:
+            wait = None
+            if timeout > 0:
+                wait = start + timeout - time.time()
+                if wait <= 0:
+                    break
+            ready = select.select(streams.keys(), [], [], wait)[0]
+            for fd in ready:
+                data = os.read(fd, 65536)
+                if not data:
+                    del streams[fd]
+                    continue
+                name = streams[fd]
+                if name == "stdout":
+                    output.append(data)
+                else:
+                    sys.stderr.write(data)
+                if log:
+                    log.write(data)
+                if callback:
+                    callback(name, data)
+        while not streams:
+            # output closed, the command itself may still be running
+            ret = cmd_proc.poll()
+            if ret is not None or \
+               (timeout > 0 and time.time() >= start + timeout):
+                break
+            time.sleep(0.05)
+        if ret is None:
+            # timeout, kill command and whatever it started
+            try:
+                os.killpg(cmd_proc.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            cmd_proc.wait()
+            ret = -99999
+    finally:
+        cmd_proc.stdout.close()
+        cmd_proc.stderr.close()
+        if log:
+            log.close()
+    return ret, "".join(output), time.time() - start
+
+def shell_cmd_timeout(cmd, timeout=0, callback=None):
     """Execute shell command till timeout"""
-    cmd_proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-    if not cmd_proc:
-        return -1, ''
-    t_timeout, tick = timeout, 2
-    ret, output = None, ''
+    ret, output, elapsed = shell_cmd_stream(cmd, timeout, callback)
+    return ret, output
+
+def iter_run(target, cmd, timeout=0):
+    """Run a command on target and yield its output as it arrives, for
+    long running commands whose output is processed on the fly. Falls
+    back to a single chunk when the target has no ssh connection.
+    @param timeout seconds, 0 means no timeout
+    @return generator of output chunks
+    """
+    connection = getattr(target, "connection", None) or target
+    ssh = getattr(connection, "ssh", None)
+    if not ssh:
+        (status, output) = target.run(cmd, timeout or None)
+        yield output
+        return
+    command = " ".join(pipes.quote(arg) for arg in ssh + [connection.ip,
+                       "export PATH=/usr/sbin:/sbin:/usr/bin:/bin; " + cmd])
+    chunks = Queue.Queue()
+    def callback(name, data):
+        if name == "stdout":
+            chunks.put(data)
+    def run():
+        try:
+            shell_cmd_stream(command, timeout, callback)
+        finally:
+            chunks.put(None)
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
     while True:
-        time.sleep(tick)
-        output = cmd_proc.communicate()[0]
-        ret = cmd_proc.poll()
-        if ret is not None:
+        data = chunks.get()
+        if data is None:
             break
+        yield data
+    thread.join()
 
-        if t_timeout > 0:
-            t_timeout -= tick
+def run_many(target, cmds, timeout=None):
+    """Run independent commands on target in a single round trip.
+    Each command runs in its own subshell, so a failing or cd-ing command
+    does not affect the next one.
+    @return list of (status, output, elapsed) tuples, one per command,
+            elapsed in seconds as measured on the target
+    """
+    marker = "@@IOTQA-%s@@" % uuid.uuid4().hex
+    script = []
+    for index, cmd in enumerate(cmds):
+        script.append("read t0 _ < /proc/uptime\n(\n%s\n) 2>&1\n"
+                      "s=$?; read t1 _ < /proc/uptime\n"
+                      "echo; echo \"%s %d $s $t0 $t1\"" % (cmd, marker, index))
+    (status, output) = target.run("\n".join(script), timeout)
 
-        if t_timeout <= 0:
-            # timeout, kill command
-            cmd_proc.kill()
-            ret = -99999
-            break
-    return ret, output
+    results = [(status if status else -1, "", 0.0)] * len(cmds)
+    chunk = []
+    for line in output.splitlines():
+        if not line.startswith(marker):
+            chunk.append(line)
+            continue
+        (_, index, ret, start, end) = line.split()
+        results[int(index)] = (int(ret), "\n".join(chunk).rstrip(),
+                               float(end) - float(start))
+        chunk = []
+    return results
+
+def read_file(target, path):
+    """Read a file on target, in-process through the test agent when
+    the target runs one, else with cat over ssh
+    @return (status, content) like target.run
+    """
+    agent = getattr(target, "agent", None)
+    if agent:
+        try:
+            return 0, agent.read_file(path)
+        except AgentError:
+            pass
+    return target.run("cat %s" % path)
+
+def wait_for_output(target, path, patterns, timeout=60):
+    """Wait until every pattern appears in the file at path on target.
+    A pattern listed n times has to appear n times (on n lines when the
+    target runs no agent). Returns as soon as all patterns are there, or
+    after timeout seconds.
+    @return (found, content of the file)
+    """
+    agent = getattr(target, "agent", None)
+    if agent:
+        try:
+            result = agent.wait_for_pattern(path, patterns, timeout)
+            return result["found"], result["data"]
+        except AgentError:
+            pass
+    checks = []
+    for pattern in sorted(set(patterns)):
+        checks.append("[ \"$(grep -cF -- '%s' %s 2>/dev/null)\" -ge %d ] "
+                      "2>/dev/null || ok=0" % (pattern.replace("'", "'\\''"),
+                                              path, patterns.count(pattern)))
+    cmd = "end=$(($(cut -d. -f1 /proc/uptime) + %d)); " \
+          "while true; do ok=1; %s; [ $ok = 1 ] && break; " \
+          "[ $(cut -d. -f1 /proc/uptime) -ge $end ] && break; sleep 1; " \
+          "done; cat %s" % (timeout, "; ".join(checks), path)
+    (status, output) = target.run(cmd, timeout + 30)
+    found = all(output.count(p) >= patterns.count(p) for p in patterns)
+    return found, output
+
+def stop_agent(target):
+    """Stop the test agent of target, if it runs one, so its interpreter
+    and ssh session do not weigh on idle measurements. The next request
+    through the agent starts it again."""
+    agent = getattr(target, "agent", None)
+    if agent:
+        agent.stop()
+
+# is-system-running states of a boot in progress
+BOOTING_STATES = ["initializing", "starting"]
+
+def wait_for_boot(target, timeout=300, interval=1):
+    """Wait until systemd finished booting target, i.e.
+    systemctl is-system-running reports running, degraded or any other
+    state that is not a boot in progress.
+    @return seconds it took, None on timeout
+    """
+    start = time.time()
+    while True:
+        (status, output) = target.run("systemctl is-system-running", 10)
+        # 255 is ssh failing to connect
+        if status != 255 and output.strip() and \
+           output.strip() not in BOOTING_STATES:
+            return time.time() - start
+        if time.time() - start >= timeout:
+            return None
+        time.sleep(interval)
+
+def reboot_and_wait(target, timeout=300):
+    """Reboot target and return as soon as sshd answers and the boot
+    finished, instead of sleeping for the worst case boot time.
+    @return seconds from the reboot command until booted, None when the
+            target did not come back within timeout
+    """
+    start = time.time()
+    engine = RebootEngine(target, down_timeout=min(timeout, 120),
+                          up_timeout=timeout)
+    try:
+        engine.reboot()
+    except RebootError as e:
+        print "reboot failed: %s" % e
+        return None
+    if wait_for_boot(target, max(timeout - (time.time() - start), 0)) is None:
+        return None
+    return time.time() - start
 
 def collect_pnp_log(casename, logname, log):
     """collect the result log for pnp part"""
@@ -0,0 +1,66 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Target used by runtest.py for exported test runs"""
+
+from oeqa.runexported import FakeTarget
+from oeqa.utils.sshpool import PooledSSHControl
+from oeqa.utils.agent import TargetAgent, AgentError
+from oeqa.utils.copycache import CopyCache
+from oeqa.utils import helper
+
+class IoTTarget(FakeTarget):
+    """FakeTarget whose commands and copies share one pooled ssh
+    connection to the device, plus an on-target test agent when the
+    device can run it. Uploaded files go through a content addressed
+    cache on the device, so each file is transferred only once"""
+
+    agent = None
+    copy_cache = None
+
+    def exportStart(self):
+        FakeTarget.exportStart(self)
+        self.connection = PooledSSHControl(self.ip, logfile=self.sshlog)
+        self.copy_cache = CopyCache(self)
+        agent = TargetAgent(self)
+        try:
+            agent.start()
+            self.agent = agent
+        except AgentError as e:
+            print "Test agent not available, using plain ssh: %s" % e
+
+    def copy_to(self, localpath, remotepath):
+        if self.copy_cache:
+            return self.copy_cache.copy_to(localpath, remotepath)
+        return FakeTarget.copy_to(self, localpath, remotepath)
+
+    def clear_cache(self):
+        """Drop every file cached on the device by copy_to"""
+        if self.copy_cache:
+            self.copy_cache.clear()
+
+    def run_many(self, cmds, timeout=None):
+        """Run independent commands in one round trip
+        @return list of (status, output, elapsed) tuples
+        """
+        return helper.run_many(self, cmds, timeout)
+
+    def reboot_and_wait(self, timeout=300):
+        """Reboot and wait until the device finished booting
+        @return seconds it took, None on timeout
+        """
+        return helper.reboot_and_wait(self, timeout)
+
+    def reconnect(self):
+        """Drop the pooled connection, e.g. after the target rebooted"""
+        if self.agent:
+            self.agent.stop()
+        if self.connection:
+            self.connection.disconnect()
+
+    def close(self):
+        """Release the pooled connection at the end of the run"""
+        if self.agent:
+            self.agent.stop()
+        if self.connection:
+            self.connection.close()
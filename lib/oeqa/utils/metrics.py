@@ -0,0 +1,154 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Structured store for PnP results.
+
+Every run appends its numeric results to one SQLite database, together
+with the image, machine and build they were measured on, so results of
+many runs can be compared without parsing the text logs of
+collect_pnp_log, which stay for the raw output.
+"""
+
+import os
+import time
+import sqlite3
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+# default database, relative to the current directory like the pnp logs
+METRICS_DB = "pnp_metrics.db"
+# build data variables stored with every run
+METADATA_KEYS = ["MACHINE", "DISTRO", "DISTRO_VERSION", "IMAGE_BASENAME",
+                 "IMAGE_LINK_NAME", "DATETIME", "BUILDNAME"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    session TEXT,
+    target TEXT,
+    machine TEXT,
+    image TEXT,
+    build TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics (name, tags, run);
+CREATE INDEX IF NOT EXISTS runs_build ON runs (machine, image, build);
+CREATE INDEX IF NOT EXISTS runs_session ON runs (session);
+"""
+
+def get_metadata(d, target=None):
+    """Run metadata from the build data store d"""
+    metadata = dict((key, d.getVar(key, True) or "") for key in METADATA_KEYS)
+    metadata["TARGET"] = target or ""
+    # one runtest.py invocation, shared by the processes of its shards
+    metadata["SESSION"] = d.getVar("PNP_SESSION", True) or ""
+    return metadata
+
+def _tags(tags):
+    # canonical text, so equal tags compare equal in SQL
+    return json.dumps(tags or {}, sort_keys=True)
+
+class MetricsStore(object):
+    """Append-only metrics database. The run row is created on the
+    first record, so a run without PnP results leaves no trace. Several
+    processes, e.g. the shards of --targets, may share one database."""
+
+    def __init__(self, path=METRICS_DB, metadata=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.run = None
+        self.conn = None
+        self.pid = os.getpid()
+
+    def _connect(self):
+        if self.conn is None:
+            dirname = os.path.dirname(os.path.abspath(self.path))
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            self.conn = sqlite3.connect(self.path, timeout=60)
+            self.conn.executescript(SCHEMA)
+        return self.conn
+
+    def _start_run(self):
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (started, session, target, machine, image, "
+                "build, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), self.metadata.get("SESSION", ""),
+                 self.metadata.get("TARGET", ""),
+                 self.metadata.get("MACHINE", ""),
+                 self.metadata.get("IMAGE_BASENAME", ""),
+                 self.metadata.get("DATETIME", ""),
+                 json.dumps(self.metadata, sort_keys=True)))
+        self.run = cursor.lastrowid
+
+    def record(self, name, value, unit, tags=None):
+        """Append one value of metric name, e.g.
+        record("boottime", 12.3, "s", {"phase": "kernel"})"""
+        if self.run is None:
+            self._start_run()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO metrics (run, name, value, unit, tags, recorded) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.run, name, float(value), unit, _tags(tags),
+                 time.time()))
+
+    def query(self, name, tags=None, runs=None, **metadata):
+        """Values of metric name, oldest first, optionally limited to
+        tags, to the runs listed in runs and to runs whose machine,
+        image or build match
+        @return list of (run, value, unit)
+        """
+        sql = "SELECT m.run, m.value, m.unit FROM metrics m " \
+              "JOIN runs r ON r.id = m.run WHERE m.name = ?"
+        args = [name]
+        if tags is not None:
+            sql += " AND m.tags = ?"
+            args.append(_tags(tags))
+        if runs is not None:
+            sql += " AND m.run IN (%s)" % ",".join("?" * len(runs))
+            args.extend(runs)
+        for column in ["machine", "image", "build"]:
+            if column in metadata:
+                sql += " AND r.%s = ?" % column
+                args.append(metadata[column])
+        sql += " ORDER BY m.run, m.recorded"
+        return self._connect().execute(sql, args).fetchall()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+_store = None
+
+def get_store():
+    """Store of the current test run, set up from the test context:
+    PNP_METRICS_DB of the build data, else METRICS_DB"""
+    global _store
+    # a store inherited from a parent process must not share its connection
+    if _store is None or _store.pid != os.getpid():
+        from oeqa.oetest import oeRuntimeTest
+        tc = oeRuntimeTest.tc
+        path = tc.d.getVar("PNP_METRICS_DB", True) or METRICS_DB
+        _store = MetricsStore(path, get_metadata(tc.d, tc.target.ip))
+    return _store
+
+def record_metric(name, value, unit, tags=None):
+    """Record a numeric PnP result in the metrics store of this run"""
+    get_store().record(name, value, unit, tags)
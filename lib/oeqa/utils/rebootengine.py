@@ -0,0 +1,155 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Reboot cycles timed with TCP connect probes on the ssh port.
+
+A probe tells three states of the target apart within a fraction of a
+second, without going through ssh:
+- DOWN: the connection times out or the host is unreachable
+- NET_UP: the connection is refused, the network stack is up but
+  nothing listens on the port yet
+- SSH_UP: the port answers with an SSH banner
+"""
+
+import time
+import errno
+import socket
+
+from oeqa.utils.regression import mean, stddev
+
+DOWN = "down"
+NET_UP = "net_up"
+SSH_UP = "ssh_up"
+# phases of a cycle, in order
+PHASES = ["shutdown", "firmware_kernel", "net_to_ssh", "total"]
+
+class RebootError(Exception):
+    """The target did not go down or come back in time"""
+    pass
+
+class RebootCycle(object):
+    """Timestamps of one reboot, host time in seconds.
+    shutdown is from the reboot command until the target stopped
+    answering, firmware_kernel until its network stack answered again,
+    net_to_ssh until sshd answered, total is the sum."""
+
+    def __init__(self, start, down, net_up, ssh_up):
+        self.start = start
+        self.down = down
+        self.net_up = net_up
+        self.ssh_up = ssh_up
+
+    def phases(self):
+        return {"shutdown": self.down - self.start,
+                "firmware_kernel": self.net_up - self.down,
+                "net_to_ssh": self.ssh_up - self.net_up,
+                "total": self.ssh_up - self.start}
+
+    def __str__(self):
+        phases = self.phases()
+        return " ".join("%s=%.2fs" % (p, phases[p]) for p in PHASES)
+
+class RebootEngine(object):
+    """Reboot the target and time each phase of the reboot"""
+
+    def __init__(self, target, port=22, interval=0.1, probe_timeout=0.25,
+                 down_timeout=120, up_timeout=300):
+        self.target = target
+        self.port = port
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.down_timeout = down_timeout
+        self.up_timeout = up_timeout
+
+    def probe(self):
+        """@return DOWN, NET_UP or SSH_UP"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.probe_timeout)
+        try:
+            try:
+                sock.connect((self.target.ip, self.port))
+            except socket.timeout:
+                return DOWN
+            except socket.error as e:
+                if e.errno in (errno.ECONNREFUSED, errno.ECONNRESET):
+                    return NET_UP
+                return DOWN
+            # sshd sends its banner first; a listening port without one
+            # is not ready to take logins yet
+            try:
+                sock.settimeout(max(self.probe_timeout, 1.0))
+                banner = sock.recv(64)
+            except socket.error:
+                banner = ""
+            return SSH_UP if banner.startswith("SSH-") else NET_UP
+        finally:
+            sock.close()
+
+    def wait_for(self, states, timeout):
+        """Probe until the state is one of states
+        @return (host time it was first seen, state), None on timeout
+        """
+        deadline = time.time() + timeout
+        while True:
+            now = time.time()
+            state = self.probe()
+            if state in states:
+                return (now, state)
+            if now >= deadline:
+                return None
+            time.sleep(max(self.interval - (time.time() - now), 0))
+
+    def reboot(self):
+        """Run one reboot cycle
+        @return RebootCycle
+        """
+        start = time.time()
+        # the command may not return once the target shuts down
+        self.target.run("reboot &", 5)
+        reconnect = getattr(self.target, "reconnect", None)
+        if reconnect:
+            reconnect()
+        seen = self.wait_for([DOWN], self.down_timeout)
+        if seen is None:
+            raise RebootError("%s did not go down within %ds" %
+                              (self.target.ip, self.down_timeout))
+        down = seen[0]
+        seen = self.wait_for([NET_UP, SSH_UP], self.up_timeout)
+        if seen is None:
+            raise RebootError("%s did not come back within %ds" %
+                              (self.target.ip, self.up_timeout))
+        net_up = seen[0]
+        if seen[1] != SSH_UP:
+            seen = self.wait_for([SSH_UP], self.up_timeout)
+            if seen is None:
+                raise RebootError("sshd of %s did not start within %ds" %
+                                  (self.target.ip, self.up_timeout))
+        return RebootCycle(start, down, net_up, seen[0])
+
+    def run(self, cycles):
+        """Run cycles reboots one after the other
+        @return list of RebootCycle
+        """
+        results = []
+        for i in range(cycles):
+            results.append(self.reboot())
+        return results
+
+def summarize(cycles):
+    """Distribution of each phase over the cycles
+    @return {phase: (min, mean, max, stddev)}
+    """
+    summary = {}
+    for phase in PHASES:
+        values = [c.phases()[phase] for c in cycles]
+        summary[phase] = (min(values), mean(values), max(values),
+                          stddev(values))
+    return summary
+
+def format_summary(cycles):
+    summary = summarize(cycles)
+    lines = ["%d reboot cycles" % len(cycles)]
+    for phase in PHASES:
+        lines.append("%s: min=%.2fs mean=%.2fs max=%.2fs stddev=%.2fs" %
+                     ((phase,) + summary[phase]))
+    return "\n".join(lines)
@@ -0,0 +1,195 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Compare the PnP results of a run against a baseline build.
+
+Each metric is compared with Welch's t-test, which does not assume the
+two builds have the same variance. A metric regresses when it moved in
+the bad direction, the change is significant at ALPHA and larger than
+MIN_CHANGE of the baseline mean.
+"""
+
+import math
+
+# significance level of the two sided test
+ALPHA = 0.05
+# relative changes smaller than this are noise even when significant
+MIN_CHANGE = 0.01
+# units where a larger value is better, everything else is a cost
+HIGHER_IS_BETTER = ["Mb/s", "MB/s", "KB/s", "req/s", "ops/s"]
+
+def mean(values):
+    return sum(values) / float(len(values))
+
+def stddev(values):
+    """Sample standard deviation, 0 for a single value"""
+    if len(values) < 2:
+        return 0.0
+    m = mean(values)
+    return math.sqrt(sum((x - m) ** 2 for x in values) / (len(values) - 1))
+
+def _betacf(a, b, x):
+    """Continued fraction of the incomplete beta function"""
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+    h = d
+    for m in range(1, 201):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+        c = 1.0 + aa / c
+        c = c if abs(c) > 1e-30 else 1e-30
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > 1e-30 else 1e-30)
+        c = 1.0 + aa / c
+        c = c if abs(c) > 1e-30 else 1e-30
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+def _betai(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    bt = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+                  a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return bt * _betacf(a, b, x) / a
+    return 1.0 - bt * _betacf(b, a, 1.0 - x) / b
+
+def t_pvalue(t, df):
+    """Two sided p-value of Student's t distribution"""
+    if math.isinf(t):
+        return 0.0
+    return _betai(df / 2.0, 0.5, df / (df + t * t))
+
+def t_critical(df, alpha=ALPHA):
+    """t such that the two sided p-value is alpha"""
+    low, high = 0.0, 1000.0
+    for i in range(100):
+        middle = (low + high) / 2
+        if t_pvalue(middle, df) > alpha:
+            low = middle
+        else:
+            high = middle
+    return high
+
+def confidence_interval(values, alpha=ALPHA):
+    """Half width of the 1 - alpha confidence interval of the mean"""
+    if len(values) < 2:
+        return float("inf")
+    return t_critical(len(values) - 1, alpha) * stddev(values) / \
+           math.sqrt(len(values))
+
+def welch_test(base, current):
+    """Welch's t-test of two samples
+    @return (t, df, p), None if a sample has less than two values or
+            neither sample varies
+    """
+    if len(base) < 2 or len(current) < 2:
+        return None
+    vb = stddev(base) ** 2 / len(base)
+    vc = stddev(current) ** 2 / len(current)
+    if vb + vc == 0:
+        # identical repeats, e.g. of the same measurement, tell nothing
+        # about the noise, a difference would look certain
+        return None
+    t = (mean(current) - mean(base)) / math.sqrt(vb + vc)
+    df = (vb + vc) ** 2 / ((vb ** 2 / (len(base) - 1) if vb else 0) +
+                          (vc ** 2 / (len(current) - 1) if vc else 0))
+    return (t, df, t_pvalue(t, df))
+
+def higher_is_better(unit):
+    return unit in HIGHER_IS_BETTER
+
+class Comparison(object):
+    """Outcome of comparing one metric between two sets of runs"""
+
+    def __init__(self, name, tags, unit, base, current):
+        self.name = name
+        self.tags = tags
+        self.unit = unit
+        self.base = base
+        self.current = current
+        self.test = welch_test(base, current)
+        self.change = (mean(current) - mean(base)) / abs(mean(base)) \
+                      if mean(base) else 0.0
+
+    @property
+    def regressed(self):
+        if self.test is None or self.test[2] >= ALPHA or \
+           abs(self.change) < MIN_CHANGE:
+            return False
+        return (self.change < 0) == higher_is_better(self.unit)
+
+    @property
+    def improved(self):
+        return self.test is not None and self.test[2] < ALPHA and \
+               abs(self.change) >= MIN_CHANGE and not self.regressed
+
+    def verdict(self):
+        if self.test is None:
+            if len(self.base) < 2 or len(self.current) < 2:
+                return "too few samples"
+            return "no variance"
+        if self.regressed:
+            return "REGRESSION"
+        if self.improved:
+            return "improved"
+        return "no change"
+
+    def __str__(self):
+        label = self.name
+        if self.tags != "{}":
+            label += " " + self.tags
+        p = "p=%.3f" % self.test[2] if self.test else "p=-"
+        return "%s: %.2f +-%.2f%s (n=%d) -> %.2f +-%.2f%s (n=%d) " \
+               "%+.1f%% %s %s" % (label,
+               mean(self.base), confidence_interval(self.base), self.unit,
+               len(self.base), mean(self.current),
+               confidence_interval(self.current), self.unit,
+               len(self.current), self.change * 100, p, self.verdict())
+
+def compare_session(store, session, baseline):
+    """Compare every metric recorded by session against the runs of the
+    baseline build on the same machine
+    @return list of Comparison
+    """
+    conn = store._connect()
+    current = conn.execute(
+        "SELECT m.name, m.tags, m.unit, m.value, r.machine FROM metrics m "
+        "JOIN runs r ON r.id = m.run WHERE r.session = ? "
+        "ORDER BY m.name, m.tags", (session,)).fetchall()
+    groups = {}
+    for (name, tags, unit, value, machine) in current:
+        groups.setdefault((name, tags, unit, machine), []).append(value)
+    comparisons = []
+    for (name, tags, unit, machine), values in sorted(groups.items()):
+        base = [row[0] for row in conn.execute(
+            "SELECT m.value FROM metrics m JOIN runs r ON r.id = m.run "
+            "WHERE m.name = ? AND m.tags = ? AND m.unit = ? AND "
+            "r.machine = ? AND r.build = ? AND r.session != ?",
+            (name, tags, unit, machine, baseline, session))]
+        if base:
+            comparisons.append(Comparison(name, tags, unit, base, values))
+    return comparisons
+
+def report_regressions(store, session, baseline):
+    """Print the comparison against baseline
+    @return number of regressed metrics
+    """
+    comparisons = compare_session(store, session, baseline)
+    print "\nPnP results compared to build %s:" % baseline
+    if not comparisons:
+        print "no metric of this run was recorded for the baseline"
+    for comparison in comparisons:
+        print comparison
+    return len([c for c in comparisons if c.regressed])
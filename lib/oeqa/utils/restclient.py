@@ -0,0 +1,195 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""HTTP client for the REST API server running on the target"""
+
+import time
+import socket
+import httplib
+import threading
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+# methods which can be sent again when the connection broke
+IDEMPOTENT = ["GET", "HEAD", "OPTIONS"]
+
+def _closed_before_response(error):
+    """Whether the server closed the connection without sending a byte
+    of the response, i.e. it dropped the idle connection instead of
+    processing the request"""
+    if not isinstance(error, httplib.BadStatusLine):
+        return False
+    line = getattr(error, "line", "")
+    return line in ("", "''") or line.startswith("No status line")
+
+class RestResponse(object):
+    """One HTTP response, latency in seconds from sending the request
+    to having read the whole body"""
+
+    def __init__(self, method, path, status, reason, headers, body, latency):
+        self.method = method
+        self.path = path
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.latency = latency
+        self._json = None
+
+    def json(self):
+        """Body parsed as JSON, None if it is not JSON"""
+        if self._json is None:
+            try:
+                self._json = json.loads(self.body)
+            except ValueError:
+                return None
+        return self._json
+
+    def __str__(self):
+        return "%s %s: %d %s (%.1fms)\n%s" % (self.method, self.path,
+               self.status, self.reason, self.latency * 1000, self.body)
+
+class RestClient(object):
+    """Send requests over persistent (keep-alive) connections instead
+    of a new connection and process per request. Every thread gets its
+    own connection, so request_many() can keep several requests in
+    flight. Proxies are never used, the server is on the local network.
+    """
+
+    def __init__(self, host, port=8000, prefix="/api/", timeout=30,
+                 concurrency=1):
+        self.host = host
+        self.port = port
+        self.prefix = prefix
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def _connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = httplib.HTTPConnection(self.host, self.port,
+                                          timeout=self.timeout)
+            self.local.conn = conn
+            self.local.used = False
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            with self.lock:
+                if conn in self.connections:
+                    self.connections.remove(conn)
+        self.local.conn = None
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request, path is relative to the API prefix
+        @return RestResponse
+        """
+        url = path if path.startswith("/") else self.prefix + path
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers = dict(headers or {})
+            headers.setdefault("Content-Type", "application/json")
+        while True:
+            conn = self._connection()
+            reused = self.local.used
+            start = time.time()
+            sent = False
+            try:
+                conn.request(method, url, body, headers or {})
+                sent = True
+                response = conn.getresponse()
+                data = response.read()
+            except (httplib.HTTPException, socket.error) as e:
+                self._drop_connection()
+                # the server may have closed an idle connection, retry
+                # once on a new one; a fresh connection failing is an error.
+                # A request which may have been processed is only sent
+                # again when that is harmless.
+                if reused and (method in IDEMPOTENT or not sent or
+                               _closed_before_response(e)):
+                    continue
+                raise
+            latency = time.time() - start
+            self.local.used = True
+            if response.getheader("connection", "").lower() == "close":
+                self._drop_connection()
+            return RestResponse(method, url, response.status,
+                                response.reason,
+                                dict(response.getheaders()), data, latency)
+
+    def wait_until_ready(self, path="system", timeout=20):
+        """Poll path until the server answers, with exponential backoff
+        @return seconds it took, None if not ready within timeout
+        """
+        start = time.time()
+        delay = 0.1
+        while True:
+            try:
+                self.request("GET", path)
+                return time.time() - start
+            except (httplib.HTTPException, socket.error):
+                pass
+            remaining = start + timeout - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, body=None, **kwargs):
+        return self.request("POST", path, body, **kwargs)
+
+    def put(self, path, body=None, **kwargs):
+        return self.request("PUT", path, body, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def request_many(self, requests, concurrency=None):
+        """Send (method, path) requests with up to concurrency of them
+        in flight at a time
+        @return list of RestResponse, or of the exception a request
+                raised, in the order of requests
+        """
+        concurrency = concurrency or self.concurrency
+        results = [None] * len(requests)
+        pending = list(enumerate(requests))
+        pending.reverse()
+        def worker():
+            while True:
+                with self.lock:
+                    if not pending:
+                        break
+                    (index, req) = pending.pop()
+                try:
+                    results[index] = self.request(*req)
+                except (httplib.HTTPException, socket.error) as e:
+                    results[index] = e
+            self._drop_connection()
+        threads = [threading.Thread(target=worker)
+                   for i in range(min(concurrency, len(requests)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def close(self):
+        """Close every connection opened by this client"""
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
@@ -0,0 +1,363 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Host side of the on-target system sampler (files/iotqa_sampler.py)"""
+
+import os
+import struct
+import tempfile
+
+SAMPLER_FILE = os.path.join(os.path.dirname(__file__), "files",
+                            "iotqa_sampler.py")
+MAGIC = "IQS1"
+HEADER = struct.Struct("<4sIdIIIQ")
+PROCESS = struct.Struct("<I16s")
+CPU_FIELDS = 8
+MEM_KEYS = ["MemTotal", "MemFree", "MemAvailable", "Buffers", "Cached",
+            "SwapTotal", "SwapFree"]
+SYSTEM = struct.Struct("<d%dQ%dQB" % (CPU_FIELDS, len(MEM_KEYS)))
+PROCS_NONE, PROCS_SAMPLED, PROCS_ONLY = 0, 1, 2
+PROC_SAMPLE = struct.Struct("<4Q")
+# upper bound of the idle window of the pnp tests measuring an idle
+# system, the time they used to wait
+IDLE_WINDOW = 180
+# part of the window measured once the system settled
+IDLE_MEASURE = 60
+# the system is settled when, over the last IDLE_STABLE seconds, the mean
+# CPU load of both halves differs by at most IDLE_CPU_TOLERANCE percent
+# points and MemAvailable moved by at most IDLE_MEM_TOLERANCE percent of
+# MemTotal
+IDLE_STABLE = 30
+IDLE_CPU_TOLERANCE = 2.0
+IDLE_MEM_TOLERANCE = 1.0
+
+class SamplerError(Exception):
+    """The sampler could not run or its output is unusable"""
+    pass
+
+class SampleSeries(object):
+    """Time series captured by the sampler.
+    times are target uptimes in seconds, cpu holds the cumulated jiffies
+    (user, nice, system, idle, iowait, irq, softirq, steal), mem the
+    meminfo values in kB, procs maps a pid to (comm, samples) where a
+    sample is (time, cpu ticks, rss, pss, uss)."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.times = []
+        self.cpu = []
+        self.mem = []
+        self.procs = {}
+        # seconds into the window the system settled, and whether it did
+        # or the settle time ran out
+        self.settled_at = 0.0
+        self.settled = False
+        self.measure = None
+        # (CPU percent, peak RSS in kB) of the sampler itself while it
+        # sampled, None when unknown
+        self.overhead = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def cpu_usage(self, since=0):
+        """Busy percentage of each interval starting at or after since
+        seconds into the window
+        @return list of (time, percent)
+        """
+        usage = []
+        for i in range(1, len(self.times)):
+            if self.times[i - 1] - self.times[0] < since:
+                continue
+            delta = [b - a for (a, b) in zip(self.cpu[i - 1], self.cpu[i])]
+            total = sum(delta)
+            if total > 0:
+                # idle and iowait are not busy
+                usage.append((self.times[i],
+                              100.0 * (total - delta[3] - delta[4]) / total))
+        return usage
+
+    def slice(self, start, end=None):
+        """Samples from start to end seconds into the window"""
+        part = SampleSeries(self.interval)
+        if not self.times:
+            return part
+        first = self.times[0] + start
+        last = self.times[0] + end if end is not None else float("inf")
+        for (i, t) in enumerate(self.times):
+            if first <= t <= last:
+                part.times.append(t)
+                part.cpu.append(self.cpu[i])
+                part.mem.append(self.mem[i])
+        part.procs = dict((pid, (name, [s for s in samples
+                                        if first <= s[0] <= last]))
+                          for (pid, (name, samples)) in self.procs.items())
+        return part
+
+    def measurement(self):
+        """The part of the window measured once the system settled"""
+        end = self.settled_at + self.measure if self.measure else None
+        return self.slice(self.settled_at, end)
+
+    def mem_used(self):
+        """MemTotal - MemAvailable of each sample
+        @return list of (time, kB)
+        """
+        return [(t, m["MemTotal"] - m["MemAvailable"])
+                for (t, m) in zip(self.times, self.mem)]
+
+def parse_samples(data):
+    """Decode the ring buffer written by iotqa_sampler.py, oldest first"""
+    if len(data) < HEADER.size or data[:4] != MAGIC:
+        raise SamplerError("Not a sampler file")
+    (_, version, interval, capacity, nprocs, proc_every, count) = \
+        HEADER.unpack_from(data, 0)
+    pids = []
+    offset = HEADER.size
+    for i in range(nprocs):
+        (pid, name) = PROCESS.unpack_from(data, offset)
+        pids.append((pid, name.rstrip("\0")))
+        offset += PROCESS.size
+    slot = SYSTEM.size + PROC_SAMPLE.size * nprocs
+    series = SampleSeries(interval)
+    series.procs = dict((pid, (name, [])) for (pid, name) in pids)
+    for n in range(max(count - capacity, 0), count):
+        pos = offset + (n % capacity) * slot
+        if pos + slot > len(data):
+            # fetched while the sampler was still writing
+            break
+        values = SYSTEM.unpack_from(data, pos)
+        uptime = values[0]
+        if values[-1] != PROCS_ONLY:
+            series.times.append(uptime)
+            series.cpu.append(values[1:1 + CPU_FIELDS])
+            series.mem.append(dict(zip(MEM_KEYS, values[1 + CPU_FIELDS:-1])))
+        if values[-1] == PROCS_NONE:
+            continue
+        pos += SYSTEM.size
+        for (pid, name) in pids:
+            sample = PROC_SAMPLE.unpack_from(data, pos)
+            pos += PROC_SAMPLE.size
+            if any(sample):
+                series.procs[pid][1].append((uptime,) + sample)
+    return series
+
+def parse_text_samples(data, interval):
+    """Decode the output of the shell fallback sampler"""
+    series = SampleSeries(interval)
+    blocks = [[]]
+    for line in data.splitlines():
+        if line.strip() == "--":
+            blocks.append([])
+        else:
+            blocks[-1].append(line)
+    # the last block may be cut short while it is written
+    for lines in blocks[:-1]:
+        if len(lines) < 2 or not lines[0].startswith("T "):
+            continue
+        cpu = [int(x) for x in lines[1].split()[1:]]
+        mem = dict.fromkeys(MEM_KEYS, 0)
+        for line in lines[2:]:
+            fields = line.split()
+            mem[fields[0].rstrip(":")] = int(fields[1])
+        series.times.append(float(lines[0].split()[1]))
+        series.cpu.append(tuple((cpu + [0] * CPU_FIELDS)[:CPU_FIELDS]))
+        series.mem.append(mem)
+    return series
+
+class Sampler(object):
+    """Run iotqa_sampler.py on the target. Targets without python get
+    a shell loop instead, which only samples the system wide values and
+    at whole second intervals. With proc_every 0 the processes are only
+    sampled once, after the window."""
+
+    remote_path = "/tmp/iotqa_sampler.py"
+    output = "/tmp/iotqa_samples.bin"
+    text_output = "/tmp/iotqa_samples.txt"
+
+    def __init__(self, target, interval=1.0, pids=None, proc_every=0):
+        self.target = target
+        self.interval = interval
+        self.pids = pids or []
+        self.proc_every = proc_every
+        self.binary = True
+        self.overhead = None
+
+    def run(self, duration, settle=None):
+        """Sample for duration seconds and wait until sampling ended.
+        The host only waits on one ssh command, it does not talk to the
+        target during the window.
+        @param settle (stable, cpu tolerance, mem tolerance, measure) to
+               end the window measure seconds after the system settled,
+               see find_settle_point
+        @return (settled_at, settled) reported by the sampler, None
+                without settle or on the shell fallback, which always
+                samples the whole window
+        """
+        capacity = int(duration / self.interval) + 2
+        self.target.run("rm -f %s %s %s.stop" % (self.output,
+                        self.text_output, self.output))
+        (status, output) = self.target.run("command -v python")
+        self.binary = status == 0
+        if self.binary:
+            try:
+                self.target.copy_to(SAMPLER_FILE, self.remote_path)
+            except AssertionError:
+                self.binary = False
+        if self.binary:
+            cmd = "python %s %s %s %s %s %d %d %s" % (self.remote_path,
+                  "--settle=%s,%s,%s,%s" % settle if settle else "",
+                  self.output, duration, self.interval, capacity,
+                  self.proc_every, " ".join(str(p) for p in self.pids))
+        else:
+            cmd = "end=$(( $(cut -d. -f1 /proc/uptime) + %d )); " \
+                  "while [ $(cut -d. -f1 /proc/uptime) -le $end ] && " \
+                  "[ ! -e %s.stop ]; do " \
+                  "echo \"T $(cut -d' ' -f1 /proc/uptime)\"; " \
+                  "head -1 /proc/stat; grep -E '^(%s):' /proc/meminfo; " \
+                  "echo --; sleep %d; done >> %s" % (duration, self.output,
+                  "|".join(MEM_KEYS), max(int(self.interval), 1),
+                  self.text_output)
+        (status, output) = self.target.run(cmd, duration + 60)
+        if status != 0:
+            raise SamplerError("Sampler failed: %s" % output)
+        settle = None
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) == 3 and fields[0] == "settled":
+                settle = (float(fields[1]), fields[2] == "1")
+            elif len(fields) == 3 and fields[0] == "sampler":
+                self.overhead = (float(fields[1]), int(fields[2]))
+        return settle
+
+    def collect(self):
+        """@return SampleSeries of the samples written so far"""
+        if not self.binary:
+            (status, output) = self.target.run("cat %s" % self.text_output)
+            if status != 0:
+                raise SamplerError("No samples: %s" % output)
+            return parse_text_samples(output, max(int(self.interval), 1))
+        (fd, localpath) = tempfile.mkstemp(prefix="iotqa_samples")
+        os.close(fd)
+        try:
+            self.target.connection.copy_from(self.output, localpath)
+            with open(localpath, "rb") as f:
+                return parse_samples(f.read())
+        except AssertionError as e:
+            raise SamplerError("Fail to fetch samples: %s" % e)
+        finally:
+            os.remove(localpath)
+
+def list_pids(target):
+    """pids of the running processes, kernel threads excluded"""
+    # kernel threads have an empty command line
+    (status, output) = target.run("grep -l . /proc/[0-9]*/cmdline")
+    return [int(path.split("/")[2]) for path in output.split()
+            if path.startswith("/proc/") and path.split("/")[2].isdigit()]
+
+def find_settle_point(series, stable=IDLE_STABLE,
+                      cpu_tolerance=IDLE_CPU_TOLERANCE,
+                      mem_tolerance=IDLE_MEM_TOLERANCE):
+    """Seconds into the window at which the preceding stable seconds
+    had a steady CPU load and MemAvailable
+    @return None if the system did not settle yet
+    """
+    usage = series.cpu_usage()
+    if not usage:
+        return None
+    start = series.times[0]
+    for (end, u) in usage:
+        if end - start < stable:
+            continue
+        window = [x for (t, x) in usage if end - stable < t <= end]
+        half = len(window) // 2
+        if half < 1:
+            continue
+        cpu_drift = abs(sum(window[:half]) / half -
+                        sum(window[half:]) / (len(window) - half))
+        available = [m["MemAvailable"] for (t, m) in
+                     zip(series.times, series.mem) if end - stable <= t <= end]
+        total = series.mem[-1]["MemTotal"] or 1
+        mem_drift = 100.0 * (max(available) - min(available)) / total
+        if cpu_drift <= cpu_tolerance and mem_drift <= mem_tolerance:
+            return end - start
+    return None
+
+def window_settings(d):
+    """idle_window() arguments from the build data: PNP_IDLE_WINDOW,
+    PNP_IDLE_MEASURE, PNP_IDLE_STABLE, PNP_IDLE_CPU_TOLERANCE,
+    PNP_IDLE_MEM_TOLERANCE and PNP_SAMPLE_INTERVAL override the
+    defaults"""
+    def get(name, default, kind):
+        return kind(d.getVar(name, True) or default)
+    return {"duration": get("PNP_IDLE_WINDOW", IDLE_WINDOW, int),
+            "measure": get("PNP_IDLE_MEASURE", IDLE_MEASURE, int),
+            "stable": get("PNP_IDLE_STABLE", IDLE_STABLE, int),
+            "cpu_tolerance": get("PNP_IDLE_CPU_TOLERANCE",
+                                 IDLE_CPU_TOLERANCE, float),
+            "mem_tolerance": get("PNP_IDLE_MEM_TOLERANCE",
+                                 IDLE_MEM_TOLERANCE, float),
+            "interval": get("PNP_SAMPLE_INTERVAL", 1.0, float)}
+
+# (target ip, boot id) -> SampleSeries captured on that boot, in order
+windows = {}
+# (target ip, boot id, consumer) -> number of windows the consumer used
+window_uses = {}
+
+def idle_window(target, duration=IDLE_WINDOW, interval=1.0,
+                measure=IDLE_MEASURE, stable=IDLE_STABLE,
+                cpu_tolerance=IDLE_CPU_TOLERANCE,
+                mem_tolerance=IDLE_MEM_TOLERANCE, consumer=None):
+    """Samples of the idle system. Sampling goes on until the system
+    settled (see find_settle_point) and then for measure more seconds,
+    at most duration seconds in total: a quiet board is measured right
+    away, a busy one as late as before. The sampler detects the settle
+    point on the target, the host waits for it to exit and fetches the
+    samples afterwards, so no ssh traffic runs during the window. The
+    processes are only sampled after the window, and the load of the
+    sampler itself is kept in overhead.
+    The tests measuring the idle system share the windows of a boot: the
+    n-th call of a consumer gets the n-th window captured on the current
+    boot, capturing it if it is the first to ask. So the idle CPU and
+    memory tests look at the same window, while every repeat of them
+    (runtest.py --pnp-repeat) gets a window of its own. Without consumer
+    a new window is captured.
+    @return SampleSeries of the whole window, measurement() is the part
+            after settled_at
+    """
+    key = None
+    if consumer is not None:
+        (status, boot_id) = target.run(
+            "cat /proc/sys/kernel/random/boot_id")
+        if status == 0 and boot_id.strip():
+            key = (target.ip, boot_id.strip())
+    if key is None:
+        return _capture_window(target, duration, interval, measure, stable,
+                               cpu_tolerance, mem_tolerance)
+    captured = windows.setdefault(key, [])
+    index = window_uses.get(key + (consumer,), 0)
+    if index >= len(captured):
+        captured.append(_capture_window(target, duration, interval, measure,
+                                        stable, cpu_tolerance, mem_tolerance))
+    window_uses[key + (consumer,)] = index + 1
+    return captured[index]
+
+def _capture_window(target, duration, interval, measure, stable,
+                    cpu_tolerance, mem_tolerance):
+    measure = min(measure, duration)
+    sampler = Sampler(target, interval, list_pids(target))
+    settle = sampler.run(duration, (stable, cpu_tolerance, mem_tolerance,
+                                    measure))
+    series = sampler.collect()
+    if not len(series):
+        raise SamplerError("Sampler wrote no samples")
+    if settle is None:
+        settled_at = find_settle_point(series, stable, cpu_tolerance,
+                                       mem_tolerance)
+        # bounded by the former fixed wait
+        settle = (settled_at, True) if settled_at is not None else \
+                 (duration - measure, False)
+    (series.settled_at, series.settled) = settle
+    series.measure = measure
+    series.overhead = sampler.overhead
+    return series
@@ -0,0 +1,80 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""SSHControl that multiplexes every ssh/scp over one master connection"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from oeqa.utils.sshcontrol import SSHControl
+
+class PooledSSHControl(SSHControl):
+    """Keep one persistent ssh master connection per target (OpenSSH
+    ControlMaster) and run all commands and copies as channels on it, so
+    only the first call pays for the ssh handshake.
+    The master is dropped whenever ssh itself reports a failure (exit
+    code 255, e.g. the target rebooted), and the next call transparently
+    opens a new one. The failed call is not retried because the command
+    may already have been executed."""
+
+    def __init__(self, ip, logfile=None, timeout=300, user='root', port=None,
+                 persist=600, keepalive=5):
+        super(PooledSSHControl, self).__init__(ip, logfile=logfile,
+                                               timeout=timeout, user=user,
+                                               port=port)
+        # keep the socket path short, unix sockets are limited to ~100 chars
+        self.control_dir = tempfile.mkdtemp(prefix="iotqa-ssh-")
+        self.control_path = os.path.join(self.control_dir, "%r@%h:%p")
+        self.pool_options = [
+                '-o', 'ControlMaster=auto',
+                '-o', 'ControlPath=%s' % self.control_path,
+                '-o', 'ControlPersist=%d' % persist,
+                '-o', 'ServerAliveInterval=%d' % keepalive,
+                '-o', 'ServerAliveCountMax=3',
+                '-o', 'ConnectTimeout=10'
+                ]
+        self.ssh = self.ssh[:1] + self.pool_options + self.ssh[1:]
+        self.scp = self.scp[:1] + self.pool_options + self.scp[1:]
+
+    def _control(self, operation):
+        """Send a control command (check, exit) to the master"""
+        command = self.ssh + ['-O', operation, self.ip]
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.call(command, stdout=devnull, stderr=devnull)
+
+    def is_connected(self):
+        """Whether a master connection is currently established"""
+        return self._control('check') == 0
+
+    def disconnect(self):
+        """Drop the master connection, the next call opens a new one"""
+        if self.is_connected():
+            self.log("[Pool] closing master connection to %s" % self.ip)
+            self._control('exit')
+
+    def close(self):
+        """Drop the master connection and remove the control directory"""
+        self.disconnect()
+        shutil.rmtree(self.control_dir, ignore_errors=True)
+
+    def run(self, command, timeout=None):
+        status, output = super(PooledSSHControl, self).run(command, timeout)
+        if status == 255:
+            self.disconnect()
+        return status, output
+
+    def copy_to(self, localpath, remotepath):
+        try:
+            return super(PooledSSHControl, self).copy_to(localpath, remotepath)
+        except AssertionError:
+            self.disconnect()
+            raise
+
+    def copy_from(self, remotepath, localpath):
+        try:
+            return super(PooledSSHControl, self).copy_from(remotepath,
+                                                           localpath)
+        except AssertionError:
+            self.disconnect()
+            raise
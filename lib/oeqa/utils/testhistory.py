@@ -0,0 +1,83 @@
+#[PROTEXCAT]
+#\License: ALL RIGHTS RESERVED
+
+"""Per test module duration history used to balance sharded runs"""
+
+import os
+import time
+import unittest
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+# number of recent runs kept per test module
+HISTORY_DEPTH = 5
+# estimate for a module that has never been timed and no other data exists
+DEFAULT_DURATION = 60.0
+
+def get_module_name(testname):
+    """Module part of a manifest entry or test id,
+    e.g. oeqa.runtime.pnp.memory"""
+    return ".".join(testname.split(".")[:4])
+
+class TestHistory(object):
+    """Recorded durations, keyed by test module id"""
+
+    def __init__(self, path):
+        self.path = path
+        self.durations = {}
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.durations = json.load(f)
+
+    def record(self, durations):
+        """Append one run worth of {module: seconds}"""
+        for module, elapsed in durations.items():
+            samples = self.durations.setdefault(module, [])
+            samples.append(round(elapsed, 2))
+            del samples[:-HISTORY_DEPTH]
+
+    def estimate(self, module):
+        """Mean of the recorded durations; modules without history get
+        the mean of all known modules"""
+        samples = self.durations.get(module)
+        if samples:
+            return sum(samples) / len(samples)
+        known = [sum(x) / len(x) for x in self.durations.values() if x]
+        return sum(known) / len(known) if known else DEFAULT_DURATION
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.durations, f, indent=4, sort_keys=True)
+        os.rename(tmp, self.path)
+
+class TestTimer(object):
+    """Measure wall time per test module of a unittest run.
+    The time between two stopTest events is charged to the module of the
+    test that just finished, so setUpClass/tearDownClass are included."""
+
+    def __init__(self):
+        self.durations = {}
+        self._mark = time.time()
+        self._stop_test = None
+
+    def install(self):
+        timer = self
+        self._mark = time.time()
+        stop_test = self._stop_test = unittest.TestResult.__dict__["stopTest"]
+        def stopTest(result, test):
+            now = time.time()
+            module = get_module_name(test.id())
+            timer.durations[module] = timer.durations.get(module, 0.0) + \
+                                      now - timer._mark
+            timer._mark = now
+            stop_test(result, test)
+        unittest.TestResult.stopTest = stopTest
+
+    def uninstall(self):
+        if self._stop_test:
+            unittest.TestResult.stopTest = self._stop_test
+            self._stop_test = None
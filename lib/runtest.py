@@ -9,8 +9,12 @@
 import sys
 import os
 import time
+import shutil
+import uuid
 import unittest
 import inspect
+import multiprocessing
+import Queue
 from functools import wraps
 
 BASEDIR = os.path.abspath(os.path.join(os.path.dirname(__file__)))
@@ -20,11 +24,14 @@ from optparse import OptionParser
 from oeqa.oetest import oeTest
 from oeqa.oetest import oeRuntimeTest
 from oeqa.oetest import runTests
-from oeqa.runexported import FakeTarget
 from oeqa.runexported import MyDataDict
 from oeqa.runexported import TestContext
 from oeqa.utils.sshcontrol import SSHControl
+from oeqa.utils.iottarget import IoTTarget
 from oeqa.utils.decorators import gettag
+from oeqa.utils.testhistory import TestHistory, TestTimer, get_module_name
+from oeqa.utils.metrics import MetricsStore
+from oeqa.utils.regression import report_regressions
 
 try:
     import simplejson as json
@@ -46,6 +53,234 @@ def wrap_runner(runner, *wargs, **wkwargs):
         return runner(*_args, **kw)
     return __wrapper
 
+def shard_tests(tclist, count, history):
+    """Split manifest entries into count shards.
+    Entries of the same test module stay together so that setUpClass runs
+    only once. Modules are placed longest first onto the least loaded
+    shard using the recorded durations in history, and each shard keeps
+    the manifest order so that ordering dependencies still hold."""
+    modules = []
+    for testname in tclist:
+        module = get_module_name(testname)
+        if module not in modules:
+            modules.append(module)
+    loads = [0.0] * count
+    assigned = [[] for _ in range(count)]
+    for module in sorted(modules, key=history.estimate, reverse=True):
+        index = loads.index(min(loads))
+        loads[index] += history.estimate(module)
+        assigned[index].append(module)
+    shards = []
+    for index in range(count):
+        print "shard %d: estimated %ds" % (index, loads[index])
+        shards.append([t for t in tclist
+                       if get_module_name(t) in assigned[index]])
+    return shards
+
+def repeat_pnp_tests(tclist, count):
+    """Run each pnp test count times in a row, so that its results
+    can be compared statistically. Every repeat takes a sample of its
+    own: the boot time test reboots the target when it already measured
+    the current boot, the n-th repeats of the idle tests share the n-th
+    idle window of the boot."""
+    repeated = []
+    for t in tclist:
+        repeated.extend([t] * (count if t.startswith("oeqa.runtime.pnp.")
+                               else 1))
+    return repeated
+
+def check_regressions(options):
+    """Compare the PnP results of this run against --baseline
+    @return 1 if a metric regressed significantly, else 0
+    """
+    if not options.baseline:
+        return 0
+    store = MetricsStore(options.metrics_db)
+    try:
+        regressions = report_regressions(store, options.session,
+                                         options.baseline)
+    finally:
+        store.close()
+    if regressions:
+        print "%d PnP metrics regressed against build %s" % (regressions,
+                                                             options.baseline)
+        return 1
+    return 0
+
+def use_xunit(output):
+    try:
+        import xmlrunner
+    except Exception:
+        raise Exception(
+          "xUnit output requested but unittest-xml-reporting not installed")
+    unittest.TextTestRunner = wrap_runner(xmlrunner.XMLTestRunner, output=output)
+
+def create_context(options, loaded, deployDir, machine, ip, tclist, log_dir):
+    """Build a TestContext with its own target for one target ip"""
+    tc = TestContext()
+    tc.testslist = tclist
+    #add testsrequired for skipModule 
+    tc.testsrequired = tc.testslist
+
+    #inject build datastore
+    d = MyDataDict()
+    if loaded.has_key("d"):
+        for key in loaded["d"].keys():
+            d[key] = loaded["d"][key]
+    d["DEPLOY_DIR"], d["MACHINE"] = deployDir, machine
+    d["TEST_LOG_DIR"] = log_dir
+    d["PNP_METRICS_DB"] = os.path.abspath(options.metrics_db)
+    d["PNP_SESSION"] = options.session
+    d["PNP_BASELINE"] = options.baseline or ""
+
+    navarch = os.popen("uname -m").read().strip()
+    d["BUILD_ARCH"] = "x86_64" if not navarch else navarch
+    if options.nativearch:
+        d["BUILD_ARCH"] = options.nativearch
+    setattr(tc, "d", d)
+
+    #inject build package manifest
+    pkgs = [pname.strip() for pname in loaded["pkgmanifest"]]
+    setattr(tc, "pkgmanifest", "\n".join(pkgs))
+
+    #inject target information
+    target = IoTTarget(d)
+    target.ip = ip
+    target.server_ip = options.server_ip if options.server_ip else "192.168.7.1"
+    setattr(tc, "target", target)
+
+    #inject others
+    for key in loaded.keys():
+        if key not in ["testslist", "d", "target", "pkgmanifest"]:
+            setattr(tc, key, loaded[key])
+
+    setattr(tc, "tagexp", options.tag)
+    return tc
+
+def shard_summary(ip, testslist):
+    return {"ip": ip, "testslist": testslist,
+            "run": 0, "failures": 0, "errors": 0, "skipped": 0,
+            "durations": {}, "crashed": False}
+
+def run_shard(tc, xunit_dir, queue):
+    """Worker process: run one shard of tests on its own target"""
+    summary = shard_summary(tc.target.ip, tc.testslist)
+    timer = TestTimer()
+    try:
+        if xunit_dir:
+            use_xunit(xunit_dir)
+        tc.target.exportStart()
+        timer.install()
+        result = runTests(tc)
+        summary["durations"] = timer.durations
+        summary["run"] = result.testsRun
+        summary["failures"] = len(result.failures)
+        summary["errors"] = len(result.errors)
+        summary["skipped"] = len(getattr(result, "skipped", []))
+    except Exception:
+        import traceback
+        traceback.print_exc(5)
+        summary["crashed"] = True
+    finally:
+        tc.target.close()
+    queue.put(summary)
+
+def collect_summaries(queue, workers, poll=10):
+    """Wait for the summary of every worker. A worker which died without
+    reporting one, e.g. killed by a signal or the OOM killer, counts as a
+    crashed shard instead of blocking the run forever.
+    @param workers {ip: (worker process, testslist)}
+    """
+    pending = dict(workers)
+    summaries = []
+    while pending:
+        try:
+            summaries.append(queue.get(timeout=poll))
+            pending.pop(summaries[-1]["ip"], None)
+            continue
+        except Queue.Empty:
+            pass
+        dead = [ip for ip in pending if not pending[ip][0].is_alive()]
+        # a worker exits only once its summary is written to the queue
+        try:
+            while True:
+                summaries.append(queue.get_nowait())
+                pending.pop(summaries[-1]["ip"], None)
+        except Queue.Empty:
+            pass
+        for ip in dead:
+            if ip not in pending:
+                continue
+            (worker, testslist) = pending.pop(ip)
+            print "%s: worker exited with code %s without a summary" % (
+                ip, worker.exitcode)
+            summary = shard_summary(ip, testslist)
+            summary["crashed"] = True
+            summaries.append(summary)
+    return summaries
+
+def merge_xunit(xunit_dir, ips):
+    """Move the per-target xUnit reports into the xUnit directory"""
+    for ip in ips:
+        subdir = os.path.join(xunit_dir, ip)
+        if not os.path.isdir(subdir):
+            continue
+        for fname in os.listdir(subdir):
+            dest = os.path.join(xunit_dir, fname)
+            if os.path.exists(dest):
+                dest = os.path.join(xunit_dir, "%s-%s" % (ip, fname))
+            shutil.move(os.path.join(subdir, fname), dest)
+        shutil.rmtree(subdir, ignore_errors=True)
+
+def run_sharded(options, loaded, deployDir, machine, tclist, log_dir, ips,
+                history):
+    """Shard tclist across several identical targets, one process each"""
+    shards = shard_tests(tclist, len(ips), history)
+    queue = multiprocessing.Queue()
+    workers = {}
+    for ip, shard in zip(ips, shards):
+        if not shard:
+            continue
+        print "%s: %s" % (ip, shard)
+        target_log_dir = os.path.join(log_dir, ip)
+        if not os.path.isdir(target_log_dir):
+            os.makedirs(target_log_dir)
+        xunit_dir = os.path.join(options.xunit, ip) if options.xunit else None
+        tc = create_context(options, loaded, deployDir, machine, ip, shard,
+                            target_log_dir)
+        worker = multiprocessing.Process(target=run_shard,
+                                         args=(tc, xunit_dir, queue),
+                                         name="runtest-%s" % ip)
+        worker.start()
+        workers[ip] = (worker, shard)
+
+    summaries = collect_summaries(queue, workers)
+    for (worker, shard) in workers.values():
+        worker.join()
+    if options.xunit:
+        merge_xunit(options.xunit, ips)
+    for summary in summaries:
+        history.record(summary["durations"])
+    history.save()
+
+    ret = 0
+    print "\n%-16s %6s %8s %6s %7s" % ("TARGET", "RUN", "FAILURES",
+                                       "ERRORS", "SKIPPED")
+    for summary in sorted(summaries, key=lambda x: ips.index(x["ip"])):
+        if summary["crashed"]:
+            ret = 1
+            print "%-16s crashed, tests: %s" % (summary["ip"],
+                                                summary["testslist"])
+            continue
+        print "%-16s %6d %8d %6d %7d" % (summary["ip"], summary["run"],
+            summary["failures"], summary["errors"], summary["skipped"])
+    print "%-16s %6d %8d %6d %7d" % ("TOTAL",
+        sum(x["run"] for x in summaries),
+        sum(x["failures"] for x in summaries),
+        sum(x["errors"] for x in summaries),
+        sum(x["skipped"] for x in summaries))
+    return ret
+
 def main():
 
     usage = "usage: %prog [options]"
@@ -53,6 +288,10 @@ def main():
     parser.add_option("-t", "--target-ip", dest="ip",
             help="The IP address of the target machine. Use this to \
             overwrite the value determined from TEST_TARGET_IP at build time")
+    parser.add_option("--targets", dest="targets",
+            help="Comma separated IP addresses of identical target machines. \
+            The test list is sharded across them and run in parallel, one \
+            worker process per target.")
     parser.add_option("-s", "--server-ip", dest="server_ip",
             help="The IP address of this machine. Use this to \
             overwrite the value determined from TEST_SERVER_IP at build time.")
@@ -78,12 +317,24 @@ def main():
             help="The native arch")
     parser.add_option("-x", "--xunit", dest="xunit",
             help="Output directory to put results in xUnit XML format")
+    parser.add_option("--history", dest="history",
+            help="File with the recorded duration of each test module, \
+            used to balance the shards of --targets. Defaults to \
+            test_history.json in the log dir.")
+    parser.add_option("--metrics-db", dest="metrics_db",
+            help="SQLite database the PnP results are appended to. \
+            Defaults to pnp_metrics.db in the log dir.")
+    parser.add_option("--baseline", dest="baseline",
+            help="Build (DATETIME of its builddata.json) to compare the \
+            PnP results with. Exits nonzero when a result regressed \
+            significantly.")
+    parser.add_option("--pnp-repeat", dest="pnp_repeat", type="int",
+            default=1, help="Run each pnp test this many times, \
+            --baseline needs at least 2 samples of each build.")
 
 
     (options, args) = parser.parse_args()
 
-    tc = TestContext()
-
     #inject testcase list
     tclist = []
     if not options.tests_list:
@@ -94,11 +345,9 @@ def main():
                 filter(lambda x: not x.startswith('#'),
                               [n.strip() for n in f.readlines()])
                 )
-    tc.testslist = tclist
-    print tc.testslist
-
-    #add testsrequired for skipModule 
-    tc.testsrequired = tc.testslist
+    if options.pnp_repeat > 1:
+        tclist = repeat_pnp_tests(tclist, options.pnp_repeat)
+    print tclist
 
     deployDir = os.path.abspath(options.deploy_dir)
     if not os.path.isdir(deployDir):
@@ -107,13 +356,10 @@ def main():
         machine = options.machine
     else:
         parser.error("Please specify target machine by -m")
+    if options.targets and options.ip:
+        parser.error("-t and --targets are mutually exclusive")
     if options.xunit:
-        try:
-            import xmlrunner
-        except Exception:
-            raise Exception(
-              "xUnit output requested but unittest-xml-reporting not installed")
-        unittest.TextTestRunner = wrap_runner(xmlrunner.XMLTestRunner, output=options.xunit)
+        use_xunit(options.xunit)
     if options.build_data:
         build_data = options.build_data
     else:
@@ -121,43 +367,39 @@ def main():
     #get build data from file
     with open(build_data, "r") as f:
         loaded = json.load(f)
-    #inject build datastore
-    d = MyDataDict()
-    if loaded.has_key("d"):
-        for key in loaded["d"].keys():
-            d[key] = loaded["d"][key]
-    d["DEPLOY_DIR"], d["MACHINE"] = deployDir, machine
     if options.log_dir:
-        d["TEST_LOG_DIR"] = os.path.abspath(options.log_dir)
+        log_dir = os.path.abspath(options.log_dir)
     else:
-        d["TEST_LOG_DIR"] = os.path.abspath(os.path.dirname(__file__))
+        log_dir = os.path.abspath(os.path.dirname(__file__))
 
-    navarch = os.popen("uname -m").read().strip()
-    d["BUILD_ARCH"] = "x86_64" if not navarch else navarch
-    if options.nativearch:
-        d["BUILD_ARCH"] = options.nativearch
-    setattr(tc, "d", d)
+    if not options.metrics_db:
+        options.metrics_db = os.path.join(log_dir, "pnp_metrics.db")
+    options.session = uuid.uuid4().hex
 
-    #inject build package manifest
-    pkgs = [pname.strip() for pname in loaded["pkgmanifest"]]
-    setattr(tc, "pkgmanifest", "\n".join(pkgs))
+    history = TestHistory(options.history if options.history else
+                          os.path.join(log_dir, "test_history.json"))
 
-    #inject target information
-    target = FakeTarget(d)
-    target.ip = options.ip if options.ip else "192.168.7.2"
-    target.server_ip = options.server_ip if options.server_ip else "192.168.7.1"
-    setattr(tc, "target", target)
-
-    #inject others
-    for key in loaded.keys():
-        if key not in ["testslist", "d", "target", "pkgmanifest"]:
-            setattr(tc, key, loaded[key])
+    if options.targets:
+        ips = [ip.strip() for ip in options.targets.split(",") if ip.strip()]
+        ret = run_sharded(options, loaded, deployDir, machine, tclist,
+                          log_dir, ips, history)
+        return check_regressions(options) or ret
 
-    target.exportStart()
-    setattr(tc, "tagexp", options.tag)
-    runTests(tc)
+    ip = options.ip if options.ip else "192.168.7.2"
+    tc = create_context(options, loaded, deployDir, machine, ip, tclist,
+                        log_dir)
+    tc.target.exportStart()
+    timer = TestTimer()
+    timer.install()
+    try:
+        runTests(tc)
+    finally:
+        timer.uninstall()
+        tc.target.close()
+    history.record(timer.durations)
+    history.save()
 
-    return 0
+    return check_regressions(options)
 
 if __name__ == "__main__":
     try: